@@ -8,6 +8,7 @@ __version__ = "0.1"
 from distutils.version import StrictVersion
 
 import argparse
+import functools
 import logging
 import os
 import platform
@@ -21,7 +22,7 @@ from pyjob.factory import TASK_PLATFORMS
 from pyjob.script import EXE_EXT
 from simbad.mr.options import MrPrograms, RefPrograms, SGAlternatives
 from simbad.parsers.mtz_parser import MtzParser
-from simbad.util import SIMBAD_DIRNAME
+from simbad.util import SIMBAD_DIRNAME, mkdir_p
 
 import simbad.db
 import simbad.util.mtz_util
@@ -74,14 +75,36 @@ class CCP4Version(StrictVersion):
             logger.debug("Detecting CCP4 version via executing pdbcur")
             stdout = cexec(["pdbcur" + EXE_EXT], permit_nonzero=True)
             tversion = None
-            for line in stdout.split(os.linesep):
+            for line in stdout.splitlines():
                 if line.startswith(" ### CCP4"):
                     tversion = line.split()[2].rstrip(":")
+                    break
             if tversion is None:
                 raise RuntimeError("Cannot determine CCP4 version")
         self.parse(tversion)
 
 
+def _cached_parser(func):
+    """Build the parser returned by ``func`` only once per process for each set of arguments
+
+    Entry points may be called several times in a long-lived process, e.g. from the tests
+    or the CCP4i2 interface, and argparse construction is pure repeated work.
+
+    Every caller gets the same parser object, so it must only be used to parse arguments
+    and never be changed, e.g. with ``add_argument`` or ``set_defaults``. Each call to
+    ``parse_args`` still returns a new namespace.
+    """
+    cache = {}
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        if args not in cache:
+            cache[args] = func(*args)
+        return cache[args]
+
+    return wrapper
+
+
 def is_valid_file(parser, arg):
     if os.path.exists(arg):
         return arg
@@ -494,15 +517,12 @@ def cleanup(directory, output_dir, csv, results_to_keep):
 def get_work_dir(run_dir, work_dir=None, ccp4_jobid=None, ccp4i2_xml=None):
     """Figure out the relative working directory by provided options"""
     if work_dir:
-        if not os.path.isdir(work_dir):
-            os.mkdir(work_dir)
-    elif run_dir and os.path.isdir(run_dir):
-        work_dir = make_workdir(run_dir, ccp4_jobid=ccp4_jobid, ccp4i2_xml=ccp4i2_xml)
+        mkdir_p(work_dir)
     elif run_dir:
-        os.mkdir(run_dir)
-        work_dir = make_workdir(run_dir, ccp4_jobid=ccp4_jobid)
+        mkdir_p(run_dir)
+        work_dir = make_workdir(run_dir, ccp4_jobid=ccp4_jobid, ccp4i2_xml=ccp4i2_xml)
     else:
-        raise RuntimeError("Not entirely sure what has happened here " + "but I should never get to here")
+        raise RuntimeError("Either a run or work directory needs to be provided")
     return os.path.abspath(work_dir)
 
 
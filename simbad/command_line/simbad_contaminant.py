@@ -18,6 +18,7 @@ import simbad.util.pyrvapi_results
 logger = None
 
 
+@simbad.command_line._cached_parser
 def contaminant_argparse():
     """Create the argparse options"""
     p = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
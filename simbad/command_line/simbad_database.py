@@ -201,8 +201,10 @@ def create_lattice_db(database):
     if not database.endswith('.npz'):
         database += ".npz"
 
+    # Cells are only stored to three decimal places, so single precision is plenty and
+    # halves the size of the array scanned on every lattice search
     logger.info('Storing database in file: %s', database)
-    np.savez_compressed(database, niggli_data)
+    np.savez_compressed(database, niggli_data.astype(np.float32))
 
 
 def create_contaminant_db(database, add_morda_domains, nproc=2, submit_qtype=None, submit_queue=False):
@@ -22,6 +22,7 @@ import simbad.util.pyrvapi_results
 logger = None
 
 
+@simbad.command_line._cached_parser
 def simbad_argparse():
     """Create the argparse options"""
     p = argparse.ArgumentParser(
@@ -5,37 +5,45 @@ __date__ = "06 Mar 2017"
 __version__ = "0.1"
 
 import argparse
+import logging
 import os
 import sys
 
-from pyjob.stopwatch import StopWatch
-
 import simbad.command_line
-import simbad.exit
-import simbad.util.logging_util
-import simbad.util.pyrvapi_results
 
-logger = None
+logger = logging.getLogger(__name__)
 
 
-def lattice_argparse():
-    """Create the argparse options"""
+def _prep_argparse():
+    """Create the options that decide which arguments the full parser needs"""
     prep = argparse.ArgumentParser(add_help=False)
     prep.add_argument("-sg", dest="space_group", type=str, default=None, help="The space group to use")
     prep.add_argument("-uc", dest="unit_cell", type=str, default=None, help="The unit cell, format 'a,b,c,alpha,beta,gamma'")
-    args, _ = prep.parse_known_args()
+    return prep
 
-    p = argparse.ArgumentParser(parents=[prep], formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+def lattice_argparse():
+    """Create the argparse options"""
+    args, _ = _prep_argparse().parse_known_args()
+    # All option groups are always registered since the lattice search reads their
+    # defaults, so the only thing that changes the parser is the MTZ argument
+    return _lattice_argparse(not (args.space_group and args.unit_cell))
+
+
+@simbad.command_line._cached_parser
+def _lattice_argparse(mtz_required):
+    """Build the full lattice search parser"""
+    p = argparse.ArgumentParser(parents=[_prep_argparse()], formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     simbad.command_line._argparse_core_options(p)
     simbad.command_line._argparse_job_submission_options(p)
     simbad.command_line._argparse_lattice_options(p)
     simbad.command_line._argparse_mtz_options(p)
     simbad.command_line._argparse_mr_options(p)
-    if args.space_group and args.unit_cell:
+    if mtz_required:
+        p.add_argument("mtz", help="The path to the input mtz file")
+    else:
         # Add to the namespace as we're looking for it later
         p.add_argument("-mtz", dest="mtz", default=None, help=argparse.SUPPRESS)
-    else:
-        p.add_argument("mtz", help="The path to the input mtz file")
     return p
 
 
@@ -43,19 +51,28 @@ def main():
     """Main function to run SIMBAD's lattice search"""
     args = lattice_argparse().parse_args()
 
+    from pyjob.stopwatch import StopWatch
+
+    import simbad.util
+    import simbad.util.logging_util
+    import simbad.util.pyrvapi_results
+
     args.work_dir = simbad.command_line.get_work_dir(args.run_dir, work_dir=args.work_dir, ccp4_jobid=args.ccp4_jobid, ccp4i2_xml=args.ccp4i2_xml)
 
-    log_file = os.path.join(args.work_dir, "simbad.log")
-    debug_log_file = os.path.join(args.work_dir, "debug.log")
-    global logger
-    logger = simbad.util.logging_util.setup_logging(args.debug_lvl, logfile=log_file, debugfile=debug_log_file)
+    # Paths inside the work directory that are needed by this script
+    work_dir = args.work_dir
+    log_file = os.path.join(work_dir, "simbad.log")
+    debug_log_file = os.path.join(work_dir, "debug.log")
+    lattice_mr_csv = os.path.join(work_dir, "latt", "lattice_mr.csv")
+
+    simbad.util.logging_util.setup_logging(args.debug_lvl, logfile=log_file, debugfile=debug_log_file)
 
     gui = simbad.util.pyrvapi_results.SimbadOutput(
-        args.rvapi_document, args.webserver_uri, args.display_gui, log_file, args.work_dir, ccp4i2_xml=args.ccp4i2_xml, tab_prefix=args.tab_prefix
+        args.rvapi_document, args.webserver_uri, args.display_gui, log_file, work_dir, ccp4i2_xml=args.ccp4i2_xml, tab_prefix=args.tab_prefix
     )
 
     simbad.command_line.print_header()
-    logger.info("Running in directory: %s\n", args.work_dir)
+    logger.info("Running in directory: %s\n", work_dir)
 
     stopwatch = StopWatch()
     stopwatch.start()
@@ -70,11 +87,10 @@ def main():
         logger.info("No results found - lattice search was unsuccessful")
         display_summary = True
 
-    if args.output_pdb and args.output_mtz:
-        csv = os.path.join(args.work_dir, "latt", "lattice_mr.csv")
-        if os.path.exists(csv):
-            result = simbad.util.result_by_score_from_csv(csv, "final_r_free", ascending=True)
-            simbad.util.output_files(args.work_dir, result, args.output_pdb, args.output_mtz)
+    if args.output_pdb and args.output_mtz and os.path.isfile(lattice_mr_csv):
+        result = simbad.util.best_result_from_csv(lattice_mr_csv, "final_r_free", ascending=True)
+        if result:
+            simbad.util.output_files(work_dir, result, args.output_pdb, args.output_mtz)
 
     stopwatch.stop()
     logger.info("All processing completed in %d days, %d hours, %d minutes, and %d seconds", *stopwatch.time_pretty)
@@ -85,10 +101,10 @@ def main():
 
 
 if __name__ == "__main__":
-    import logging
-
     logging.basicConfig(level=logging.NOTSET)
     try:
         main()
     except Exception:
+        import simbad.exit
+
         simbad.exit.exit_error(*sys.exc_info())
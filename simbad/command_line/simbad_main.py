@@ -8,19 +8,16 @@ __email__ = "hlasimpk@liv.ac.uk"
 __version__ = "0.1"
 
 import argparse
+import logging
 import os
 import sys
 
-from pyjob.stopwatch import StopWatch
-
 import simbad.command_line
-import simbad.exit
-import simbad.util.logging_util
-import simbad.util.pyrvapi_results
 
-logger = None
+logger = logging.getLogger(__name__)
 
 
+@simbad.command_line._cached_parser
 def simbad_argparse():
     """Create the argparse options"""
     p = argparse.ArgumentParser(
@@ -42,14 +39,19 @@ def main():
     """Main SIMBAD routine"""
     args = simbad_argparse().parse_args()
 
+    from pyjob.stopwatch import StopWatch
+
+    import simbad.util
+    import simbad.util.logging_util
+    import simbad.util.pyrvapi_results
+
     args.work_dir = simbad.command_line.get_work_dir(
         args.run_dir, work_dir=args.work_dir, ccp4_jobid=args.ccp4_jobid, ccp4i2_xml=args.ccp4i2_xml
     )
 
     log_file = os.path.join(args.work_dir, 'simbad.log')
     debug_log_file = os.path.join(args.work_dir, 'debug.log')
-    global logger
-    logger = simbad.util.logging_util.setup_logging(args.debug_lvl, logfile=log_file, debugfile=debug_log_file)
+    simbad.util.logging_util.setup_logging(args.debug_lvl, logfile=log_file, debugfile=debug_log_file)
 
     if not os.path.isfile(args.amore_exe):
         raise OSError("amore executable not found")
@@ -64,60 +66,39 @@ def main():
     stopwatch = StopWatch()
     stopwatch.start()
 
-    end_of_cycle, solution_found, all_results = False, False, {}
-    while not (solution_found or end_of_cycle):
-        # =====================================================================================
-        # Perform the lattice search
-        solution_found = simbad.command_line._simbad_lattice_search(args)
-        logger.info("Lattice search completed in %d days, %d hours, %d minutes, and %d seconds",
-                    *stopwatch.lap.time_pretty)
-
-        if solution_found and not args.process_all:
-            logger.info(
-                "Lucky you! SIMBAD worked its charm and found a lattice match for you.")
-            continue
-        elif solution_found and args.process_all:
-            logger.info(
-                "SIMBAD thinks it has found a solution however process_all is set, continuing to contaminant search")
-        else:
-            logger.info("No results found - lattice search was unsuccessful")
-
-        if args.output_pdb and args.output_mtz:
-            csv = os.path.join(args.work_dir, 'latt/lattice_mr.csv')
-            all_results['latt'] = simbad.util.result_by_score_from_csv(csv, 'final_r_free', ascending=True)
-
-        gui.display_results(False, args.results_to_display)
-
-        # =====================================================================================
-        # Perform the contaminant search
-        solution_found = simbad.command_line._simbad_contaminant_search(args)
-        logger.info("Contaminant search completed in %d days, %d hours, %d minutes, and %d seconds",
-                    *stopwatch.lap.time_pretty)
+    # Each search is tried in turn until one of them finds a solution. process_all only
+    # carries on past a solution when there is another search to run
+    searches = (
+        ("lattice", simbad.command_line._simbad_lattice_search, os.path.join("latt", "lattice_mr.csv"),
+         "Lucky you! SIMBAD worked its charm and found a lattice match for you.",
+         "SIMBAD thinks it has found a solution however process_all is set, continuing to contaminant search"),
+        ("contaminant", simbad.command_line._simbad_contaminant_search, os.path.join("cont", "cont_mr.csv"),
+         "Check you out, crystallizing contaminants! But don't worry, SIMBAD figured it out and found a solution.",
+         None),
+    )
 
-        if solution_found:
-            logger.info(
-                "Check you out, crystallizing contaminants! But don't worry, SIMBAD figured it out and found a solution.")
-            continue
+    all_results = {}
+    for name, search, csv, success_msg, process_all_msg in searches:
+        solution_found = search(args)
+        logger.info("%s search completed in %d days, %d hours, %d minutes, and %d seconds",
+                    name.capitalize(), *stopwatch.lap.time_pretty)
+
+        if solution_found and not (args.process_all and process_all_msg):
+            logger.info(success_msg)
+            break
+        elif solution_found:
+            logger.info(process_all_msg)
         else:
-            logger.info(
-                "No results found - contaminant search was unsuccessful")
+            logger.info("No results found - %s search was unsuccessful", name)
 
         if args.output_pdb and args.output_mtz:
-            csv = os.path.join(args.work_dir, 'cont/cont_mr.csv')
-            all_results['cont'] = simbad.util.result_by_score_from_csv(csv, 'final_r_free', ascending=True)
+            csv = os.path.join(args.work_dir, csv)
+            all_results[name] = simbad.util.result_by_score_from_csv(csv, 'final_r_free', ascending=True)
 
         gui.display_results(False, args.results_to_display)
 
-        # =====================================================================================
-        # Make sure we only run the loop once for now
-        end_of_cycle = True
-
-    if len(all_results) >= 1:
-        if sys.version_info.major == 3:
-            sorted_results = sorted(all_results.items(), key=lambda k, v: (v[1], k))
-        else:
-            sorted_results = sorted(all_results.iteritems(), key=lambda k, v: (v[1], k))
-        result = sorted_results[0][1]
+    if all_results:
+        result = min(all_results.values(), key=lambda r: r[1])
         simbad.util.output_files(args.work_dir, result, args.output_pdb, args.output_mtz)
 
     stopwatch.stop()
@@ -130,9 +111,9 @@ def main():
 
 
 if __name__ == "__main__":
-    import logging
     logging.basicConfig(level=logging.NOTSET)
     try:
         main()
     except Exception:
+        import simbad.exit
         simbad.exit.exit_error(*sys.exc_info())
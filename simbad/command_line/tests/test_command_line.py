@@ -0,0 +1,48 @@
+"""Test functions for simbad.command_line"""
+
+__author__ = "Adam Simpkin"
+__date__ = "14 Oct 2026"
+
+import unittest
+import simbad.command_line.simbad_main
+
+
+class Test(unittest.TestCase):
+    """Unit test"""
+
+    def test_cached_parser_1(self):
+        """Test case for simbad.command_line._cached_parser"""
+
+        parser = simbad.command_line.simbad_main.simbad_argparse()
+        self.assertIs(simbad.command_line.simbad_main.simbad_argparse(), parser)
+
+        args_1 = simbad.command_line.simbad_main.simbad_argparse().parse_args(["-nproc", "4", "input.mtz"])
+        args_2 = simbad.command_line.simbad_main.simbad_argparse().parse_args(["-nproc", "4", "input.mtz"])
+        self.assertEqual(vars(args_1), vars(args_2))
+        self.assertIsNot(args_1, args_2)
+
+        # Changing one result must not leak into the next parse
+        args_1.nproc = 8
+        args_1.mtz = "other.mtz"
+        args_3 = simbad.command_line.simbad_main.simbad_argparse().parse_args(["input.mtz"])
+        self.assertEqual(args_2.nproc, 4)
+        self.assertEqual(args_3.mtz, "input.mtz")
+        self.assertEqual(args_3.nproc, parser.get_default("nproc"))
+
+    def test_cached_parser_2(self):
+        """Test case for simbad.command_line._cached_parser"""
+
+        calls = []
+
+        @simbad.command_line._cached_parser
+        def build(value):
+            calls.append(value)
+            return [value]
+
+        self.assertIs(build(1), build(1))
+        self.assertIsNot(build(1), build(2))
+        self.assertEqual(calls, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,40 +4,28 @@ __author__ = "Adam Simpkin"
 __date__ = "17 Oct 2017"
 __version__ = "0.1"
 
+from collections import namedtuple
 
-class MrScore(object):
-    """A molecular replacement scoring class"""
+_fields = [
+    "pdb_code",
+    "final_r_fact",
+    "final_r_free",
+    "molrep_score",
+    "molrep_tfscore",
+    "phaser_tfz",
+    "phaser_llg",
+    "phaser_rfz",
+    "dano_peak_height",
+    "nearest_atom",
+]
 
-    __slots__ = (
-        "pdb_code",
-        "final_r_fact",
-        "final_r_free",
-        "molrep_score",
-        "molrep_tfscore",
-        "phaser_tfz",
-        "phaser_llg",
-        "phaser_rfz",
-        "dano_peak_height",
-        "nearest_atom",
-    )
 
-    def __init__(self, pdb_code):
-        self.pdb_code = pdb_code
-        self.molrep_score = None
-        self.molrep_tfscore = None
-        self.phaser_tfz = None
-        self.phaser_llg = None
-        self.phaser_rfz = None
-        self.final_r_fact = 1.0
-        self.final_r_free = 1.0
-        self.dano_peak_height = None
-        self.nearest_atom = None
+class MrScore(namedtuple("MrScore", _fields)):
+    """A molecular replacement scoring class"""
 
-    def __repr__(self):
-        string = "{name}(pdb_code={pdb_code} final_r_fact={final_r_fact} final_r_free={final_r_free})"
-        return string.format(name=self.__class__.__name__, **{k: getattr(self, k) for k in self.__slots__})
+    __slots__ = ()
 
-    def _asdict(self):
-        """Convert the :obj:`_MrScore <simbad.score.mr_score.MrScore>`
-        object to a dictionary"""
-        return {k: getattr(self, k) for k in self.__slots__}
+    def __new__(cls, pdb_code, final_r_fact=1.0, final_r_free=1.0, molrep_score=None, molrep_tfscore=None,
+                phaser_tfz=None, phaser_llg=None, phaser_rfz=None, dano_peak_height=None, nearest_atom=None):
+        return super(MrScore, cls).__new__(cls, pdb_code, final_r_fact, final_r_free, molrep_score, molrep_tfscore,
+                                           phaser_tfz, phaser_llg, phaser_rfz, dano_peak_height, nearest_atom)
@@ -22,7 +22,11 @@ logger = logging.getLogger(__name__)
 class LatticeSearch(object):
     """A class to do a search for PDB entries with similar unit cell dimensions."""
 
+    __slots__ = ("_lattice_db_fname", "model_dir", "results")
+
     class _ResultCache(object):
+        __slots__ = ("_codes", "_data")
+
         def __init__(self):
             self._codes = set()
             self._data = []
@@ -89,32 +93,38 @@ class LatticeSearch(object):
 
         """
         space_group = self.check_sg(space_group)
-        niggli_cell = self.calculate_niggli_cell(unit_cell, space_group)
+        unit_cell = self._to_float_cell(unit_cell)
+        niggli_cell = self.calculate_niggli_cell(unit_cell.tolist(), space_group)
         niggli_cell = np.array(niggli_cell)
 
         tol_niggli_cell = niggli_cell * tolerance
 
-        results = self._ResultCache()
         with np.load(self.lattice_db_fname) as compressed:
-            for entry in compressed["arr_0"]:
-                pdb_code = "".join(chr(c) for c in entry[:4].astype("uint8"))
-                pdb_path = os.path.join(self.model_dir, "{}.pdb".format(pdb_code))
-                alt_cell = chr(int(entry[4])) if entry[4] != 0.0 else " "
-                db_cell = entry[5:]
-
-                if self.cell_within_tolerance(niggli_cell, db_cell, tol_niggli_cell):
-                    total_pen, length_pen, angle_pen = self.calculate_penalties(niggli_cell, db_cell)
-                    vol_diff = self.calculate_volume_difference(niggli_cell, db_cell)
-                    if total_pen < max_penalty:
-                        prob = self.calculate_probability(total_pen)
-                        score = LatticeSearchResult(pdb_code, pdb_path, alt_cell, db_cell, vol_diff, total_pen, length_pen, angle_pen, prob)
-                        results.append(score)
+            lattice_db = compressed["arr_0"]
+
+        # Filter the whole database in one go and only score the entries within tolerance
+        within_tolerance = self.cells_within_tolerance(niggli_cell, lattice_db[:, 5:], tol_niggli_cell)
+
+        results = self._ResultCache()
+        for entry in lattice_db[within_tolerance]:
+            pdb_code = "".join(chr(c) for c in entry[:4].astype("uint8"))
+            pdb_path = os.path.join(self.model_dir, "{}.pdb".format(pdb_code))
+            alt_cell = chr(int(entry[4])) if entry[4] != 0.0 else " "
+            # Newer databases are stored in single precision
+            db_cell = entry[5:].astype(np.float64).round(decimals=3)
+
+            total_pen, length_pen, angle_pen = self.calculate_penalties(niggli_cell, db_cell)
+            if total_pen < max_penalty:
+                vol_diff = self.calculate_volume_difference(niggli_cell, db_cell)
+                prob = self.calculate_probability(total_pen)
+                score = LatticeSearchResult(pdb_code, pdb_path, alt_cell, db_cell, vol_diff, total_pen, length_pen, angle_pen, prob)
+                results.append(score)
 
         results_sorted = sorted(results, key=lambda x: float(x.total_penalty), reverse=False)
         self.results = results_sorted[:max_to_keep]
 
-    @classmethod
-    def calculate_penalties(cls, query, reference):
+    @staticmethod
+    def calculate_penalties(query, reference):
         """Calculate the linear cell variation between unit cells
 
         Parameters
@@ -139,8 +149,8 @@ class LatticeSearch(object):
         total_penalty = length_penalty + angle_penalty
         return total_penalty, length_penalty, angle_penalty
 
-    @classmethod
-    def calculate_probability(cls, penalty_score):
+    @staticmethod
+    def calculate_probability(penalty_score):
         """Calculate the probability that a penalty score will give a solution
 
         Parameters
@@ -156,8 +166,8 @@ class LatticeSearch(object):
         x = -1.01 * penalty_score + 2.11
         return np.around(1 / (1 + np.exp(-x)), decimals=3)
 
-    @classmethod
-    def cell_within_tolerance(cls, query, reference, tolerance):
+    @staticmethod
+    def cell_within_tolerance(query, reference, tolerance):
         """Compare two cells and determine if ``query`` is within ``reference`` cell parameter tolerance
 
         Parameters
@@ -176,8 +186,32 @@ class LatticeSearch(object):
         """
         return np.all(np.absolute(query - reference) <= tolerance)
 
-    @classmethod
-    def calculate_volume_difference(cls, query, reference):
+    @staticmethod
+    def cells_within_tolerance(query, references, tolerance):
+        """Compare a cell against many cells and determine which are within ``tolerance`` of ``query``
+
+        Parameters
+        ----------
+        query : list, tuple
+           The query cell parameters
+        references : :obj:`~numpy.ndarray`
+           The reference cell parameters, one cell per row
+        tolerance : list, tuple
+           The tolerance cell parameter values
+
+        Returns
+        -------
+        :obj:`~numpy.ndarray`
+           A boolean mask with one entry per row in ``references``
+
+        """
+        # Compare in the precision of the reference cells to avoid upcasting the whole array
+        query = np.asarray(query, dtype=references.dtype)
+        tolerance = np.asarray(tolerance, dtype=references.dtype)
+        return np.all(np.absolute(references - query) <= tolerance, axis=1)
+
+    @staticmethod
+    def calculate_volume_difference(query, reference):
         """Calculate the difference in volume between the query unit cell and the reference unit cell
 
         Parameters
@@ -224,6 +258,11 @@ class LatticeSearch(object):
         logger.info("Niggli cell calculated as: [%s]", ", ".join(map(str, niggli_cell)))
         return niggli_cell
 
+    @staticmethod
+    def _to_float_cell(cell):
+        """Convert cell parameters given as numbers or strings to a :obj:`~numpy.ndarray`"""
+        return np.asarray(list(cell), dtype=np.float64)
+
     @staticmethod
     def check_sg(sg):
         """Check the space group for known anomalies"""
@@ -23,103 +23,104 @@ class Test(unittest.TestCase):
         lattice_db = os.path.join(SHARE_DIR, "static", "niggli_database.npz")
         cls.LS = LatticeSearch(lattice_db, os.getcwd())
 
+        cls.SPACE_GROUP = "P212121"
+        cls.LIST_CELL_A = [73.58, 38.73, 23.19, 90.00, 90.00, 90.00]
+        cls.CELL_A = np.asarray(cls.LIST_CELL_A)
+        cls.CELL_B_DIFF = np.asarray([41.34, 123.01, 93.23, 120.00, 90.00, 89.00])
+        cls.CELL_B_TOL_BAD = np.asarray([69.16, 38.73, 23.19, 90.00, 90.00, 90.00])
+        cls.CELL_B_VOL = np.asarray([63.28, 38.73, 29.01, 90.00, 90.00, 90.00])
+        cls.TOL = cls.CELL_A * 0.05
+
     @unittest.skipIf('THIS_IS_TRAVIS' in os.environ, "not implemented in Travis CI")
     def test_search_1(self):
         """Test case for LatticeSearch.search"""
 
         # Process the data from the toxd test case
-        space_group = "P212121"
-        unit_cell = [73.58, 38.73, 23.19, 90.00, 90.00, 90.00]
-
-        self.LS.search(space_group, unit_cell)
+        self.LS.search(self.SPACE_GROUP, self.LIST_CELL_A)
         results = self.LS.results
 
         # Take the name of the top result (should be toxd)
-        for i, r in enumerate(results):
-            if i == 0:
-                data = r.pdb_code
-
+        data = results[0].pdb_code
         reference_data = "1DTX"
 
         self.assertEqual(data.upper(), reference_data)
 
-    def test_calculate_penalties_1(self):
-        """Test case for LatticeSearch.calculate_penalties"""
-
-        # Same cells
-        unit_cell_1 = np.array([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        unit_cell_2 = np.array([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-
-        data = self.LS.calculate_penalties(unit_cell_1, unit_cell_2)
-        reference_data = (0.0, 0.0, 0.0)
-
-        self.assertEqual(data, reference_data)
-
-    def test_calculate_penalties_2(self):
+    def test_calculate_penalties(self):
         """Test case for LatticeSearch.calculate_penalties"""
 
-        # Different cells
-        unit_cell_1 = np.array([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        unit_cell_2 = np.array([41.34, 123.01, 93.23, 120.00, 90.00, 89.00])
-
-        data = self.LS.calculate_penalties(unit_cell_1, unit_cell_2)
-        reference_data = (217.56, 186.56, 31.0)
-
-        self.assertEqual(data, reference_data)
-
-    def test_calculate_probability_1(self):
+        cases = [
+            # Same cells
+            (self.CELL_A.copy(), (0.0, 0.0, 0.0)),
+            # Different cells
+            (self.CELL_B_DIFF, (217.56, 186.56, 31.0)),
+        ]
+        for i, (reference, reference_data) in enumerate(cases):
+            data = self.LS.calculate_penalties(self.CELL_A, reference)
+            self.assertEqual(data, reference_data, msg="case {}".format(i))
+
+    def test_calculate_probability(self):
         """Test case for LatticeSearch.calculate_probability"""
 
-        score = 0.0
-        data = self.LS.calculate_probability(score)
-        reference_data = 0.892
-
-        self.assertEqual(data, reference_data)
-
-    def test_calculate_probability_2(self):
-        """Test case for LatticeSearch.calculate_probability"""
+        cases = [(0.0, 0.892), (0.25, 0.865)]
+        for score, reference_data in cases:
+            data = self.LS.calculate_probability(score)
+            self.assertEqual(data, reference_data, msg="score {}".format(score))
 
-        score = 0.25
-        data = self.LS.calculate_probability(score)
-        reference_data = 0.865
-
-        self.assertEqual(data, reference_data)
-
-    def test_cell_within_tolerance_1(self):
-        """Test case for LatticeSearch.cell_within_tolerance"""
-
-        # Same cells
-        unit_cell_1 = np.asarray([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        unit_cell_2 = np.asarray([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        tolerance = unit_cell_1 * 0.05
-
-        data = self.LS.cell_within_tolerance(unit_cell_1, unit_cell_2, tolerance)
-        reference_data = True
-
-        self.assertEqual(data, reference_data)
-
-    def test_cell_within_tolerance_2(self):
+    def test_cell_within_tolerance(self):
         """Test case for LatticeSearch.cell_within_tolerance"""
 
-        # One parameter beyond 0.05 tolerance
-        unit_cell_1 = np.asarray([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        unit_cell_2 = np.asarray([69.16, 38.73, 23.19, 90.00, 90.00, 90.00])
-        tolerance = unit_cell_1 * 0.05
-
-        data = self.LS.cell_within_tolerance(unit_cell_1, unit_cell_2, tolerance)
-        reference_data = False
-
-        self.assertEqual(data, reference_data)
+        cases = [
+            # Same cells
+            (self.CELL_A.copy(), True),
+            # One parameter beyond 0.05 tolerance
+            (self.CELL_B_TOL_BAD, False),
+        ]
+        for i, (reference, reference_data) in enumerate(cases):
+            data = self.LS.cell_within_tolerance(self.CELL_A, reference, self.TOL)
+            self.assertEqual(data, reference_data, msg="case {}".format(i))
+
+    def test_cells_within_tolerance(self):
+        """Test case for LatticeSearch.cells_within_tolerance"""
+
+        references = np.vstack([self.CELL_A, self.CELL_B_TOL_BAD, self.CELL_B_DIFF])
+        data = self.LS.cells_within_tolerance(self.CELL_A, references, self.TOL)
+        reference_data = [True, False, False]
+
+        self.assertEqual(data.tolist(), reference_data)
+
+    def test_cells_within_tolerance_float32(self):
+        """Test case for LatticeSearch.cells_within_tolerance with a single precision database"""
+
+        # The database is stored in float32 while the query and tolerance are float64. These
+        # values are exact in both, so on the boundary they must match and just past it they must not
+        query = [80.0, 40.0, 20.0, 90.0, 90.0, 90.0]
+        tolerance = [4.0, 2.0, 1.0, 4.5, 4.5, 4.5]
+        references = np.asarray([
+            [84.0, 42.0, 21.0, 94.5, 94.5, 94.5],
+            [76.0, 38.0, 19.0, 85.5, 85.5, 85.5],
+            [84.0078125, 40.0, 20.0, 90.0, 90.0, 90.0],
+            [80.0, 40.0, 18.9921875, 90.0, 90.0, 90.0],
+        ], dtype=np.float32)
+        data = self.LS.cells_within_tolerance(np.asarray(query), references, np.asarray(tolerance))
+        reference_data = [True, True, False, False]
+
+        self.assertEqual(data.tolist(), reference_data)
+        self.assertEqual(
+            data.tolist(),
+            self.LS.cells_within_tolerance(np.asarray(query), references.astype(np.float64), np.asarray(tolerance)).tolist()
+        )
+
+        # The fixed test cells give the same answer whichever precision they are stored in
+        references = np.vstack([self.CELL_A, self.CELL_B_TOL_BAD, self.CELL_B_DIFF]).astype(np.float32)
+        data = self.LS.cells_within_tolerance(self.CELL_A, references, self.TOL)
+        self.assertEqual(data.tolist(), [True, False, False])
 
     @unittest.skipIf('THIS_IS_TRAVIS' in os.environ, "not implemented in Travis CI")
     def test_calculate_volume_difference_1(self):
         """Test case for LatticeSearch.calculate_volume_difference"""
 
         # Same cells
-        unit_cell_1 = np.asarray([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        unit_cell_2 = np.asarray([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-
-        data = self.LS.calculate_volume_difference(unit_cell_1, unit_cell_2)
+        data = self.LS.calculate_volume_difference(self.CELL_A, self.CELL_A.copy())
         reference_data = 0.00
 
         self.assertEqual(data, reference_data)
@@ -128,11 +129,8 @@ class Test(unittest.TestCase):
     def test_calculate_volume_difference_2(self):
         """Test case for LatticeSearch.calculate_volume_difference"""
 
-        # Same cells
-        unit_cell_1 = np.asarray([73.58, 38.73, 23.19, 90.00, 90.00, 90.00])
-        unit_cell_2 = np.asarray([63.28, 38.73, 29.01, 90.00, 90.00, 90.00])
-
-        data = self.LS.calculate_volume_difference(unit_cell_1, unit_cell_2)
+        # Different cells
+        data = self.LS.calculate_volume_difference(self.CELL_A, self.CELL_B_VOL)
         reference_data = 5012.925
 
         self.assertEqual(data, reference_data)
@@ -141,10 +139,7 @@ class Test(unittest.TestCase):
     def test_calculate_niggli_cell_1(self):
         """Test case for LatticeSearch.calculate_niggli_cell"""
 
-        space_group = "P212121"
-        unit_cell = [73.58, 38.73, 23.19, 90.00, 90.00, 90.00]
-
-        data = self.LS.calculate_niggli_cell(unit_cell, space_group)
+        data = self.LS.calculate_niggli_cell(self.LIST_CELL_A, self.SPACE_GROUP)
         reference_data = [23.19, 38.73, 73.58, 90.0, 90.0, 90.0]
 
         self.assertEqual(data, reference_data)
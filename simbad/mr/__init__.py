@@ -7,6 +7,7 @@ __date__ = "09 Mar 2017"
 __version__ = "1.0"
 
 import logging
+import operator
 import os
 
 from pyjob.script import ScriptCollector, Script
@@ -18,6 +19,9 @@ from simbad.parsers import molrep_parser
 from simbad.parsers import mtz_parser
 from simbad.parsers import phaser_parser
 from simbad.parsers import refmac_parser
+from simbad.util import FileCache
+from simbad.util import mkdir_p
+from simbad.util import parallel_map
 from simbad.util import source_ccp4
 from simbad.util import submit_chunk
 from simbad.util.pdb_util import PdbStructure
@@ -33,6 +37,9 @@ logger = logging.getLogger(__name__)
 EXPORT = "SET" if os.name == "nt" else "export"
 CMD_PREFIX = "call" if os.name == "nt" else ""
 
+# Final R factors of parsed refinement logs
+_REFMAC_CACHE = FileCache(maxsize=4096)
+
 
 class MrSubmit(object):
     """Class to run MR on a defined set of models
@@ -73,9 +80,11 @@ class MrSubmit(object):
         self._mtz = None
         self._mtz_obj = None
         self._mr_program = None
+        self._mr_python_module = None
         self._nmol = None
         self._output_dir = None
         self._refine_program = None
+        self._refine_python_module = None
         self._refine_type = None
         self._refine_cycles = None
         self._search_results = []
@@ -84,6 +93,8 @@ class MrSubmit(object):
         self.dano_columns = []
         self.sgalternative = sgalternative
         self.mat_prob = None
+        self._mr_options = None
+        self._script_env = None
         self.mtz = mtz
         self.mr_program = mr_program
         self.mute = False
@@ -105,8 +116,8 @@ class MrSubmit(object):
     def mtz(self, mtz):
         """Define the input MTZ file"""
         self._mtz = os.path.abspath(mtz)
-        self._mtz_obj = mtz_parser.MtzParser(mtz)
-        self._mtz_obj.parse()
+        self._mtz_obj = mtz_parser.parsed_mtz(mtz)
+        self._mr_options = None
 
     @property
     def mtz_obj(self):
@@ -125,8 +136,8 @@ class MrSubmit(object):
 
     @property
     def search_results(self):
-        """The results from the amore rotation search"""
-        return sorted(self._search_results, key=lambda x: float(x.final_r_free), reverse=False)
+        """The MR results, sorted by final R free"""
+        return self._search_results
 
     @property
     def sgalternative(self):
@@ -141,10 +152,17 @@ class MrSubmit(object):
         else:
             self._sgalternative = sgalternative
 
+    @property
+    def mr_options(self):
+        """The MR program options that are the same for every model"""
+        if self._mr_options is None:
+            self._mr_options = self._mr_program_options()
+        return self._mr_options
+
     @property
     def mr_python_module(self):
         """The MR python module"""
-        return MrPrograms[self.mr_program].value
+        return self._mr_python_module
 
     @property
     def mr_program(self):
@@ -156,6 +174,8 @@ class MrSubmit(object):
         """Define the molecular replacement program to use"""
         if mr_program.lower() in MrPrograms.__members__:
             self._mr_program = mr_program.lower()
+            self._mr_python_module = MrPrograms[self._mr_program].value
+            self._mr_options = None
         else:
             msg = "Unknown MR program!"
             raise RuntimeError(msg)
@@ -163,7 +183,7 @@ class MrSubmit(object):
     @property
     def refine_python_module(self):
         """The Refinement python module"""
-        return RefPrograms[self.refine_program].value
+        return self._refine_python_module
 
     @property
     def refine_program(self):
@@ -175,6 +195,7 @@ class MrSubmit(object):
         """Define the refinement program to use"""
         if refine_program.lower() in RefPrograms.__members__:
             self._refine_program = refine_program
+            self._refine_python_module = RefPrograms[refine_program.lower()].value
         else:
             msg = "Unknown Refinement program!"
             raise RuntimeError(msg)
@@ -208,6 +229,14 @@ class MrSubmit(object):
     def output_dir(self, output_dir):
         """Define the output directory"""
         self._output_dir = output_dir
+        self._script_env = None
+
+    @property
+    def script_environment(self):
+        """The CCP4 setup command, scratch directory for the jobs and original CCP4 scratch directory"""
+        if self._script_env is None:
+            self._script_env = self._script_environment()
+        return self._script_env
 
     @property
     def timeout(self):
@@ -252,14 +281,16 @@ class MrSubmit(object):
             Output log file from refinement program
 
         """
-        if not os.path.isdir(self.output_dir):
-            os.mkdir(self.output_dir)
+        mkdir_p(self.output_dir)
 
         if self.existing_solution(results):
             return
 
         self.sol_cont = SolventContent(self.mtz_obj.cell.volume_per_image())
         self.mat_prob = MatthewsProbability(self.mtz_obj.cell.volume_per_image())
+        # Work these out again for each submission, they are then shared by every script
+        self._mr_options = None
+        self._script_env = None
 
         run_files = []
         collector = ScriptCollector(None)
@@ -280,67 +311,42 @@ class MrSubmit(object):
 
         submit_chunk(*input_arguments)
 
-        mr_results = []
-        mr_pdbouts, mr_logfiles, ref_logfiles = zip(*run_files)
-        for result, mr_logfile, mr_pdbout, ref_logfile in zip(results, mr_logfiles, mr_pdbouts, ref_logfiles):
-            if not os.path.isfile(mr_logfile):
-                logger.debug("Cannot find %s MR log file: %s", self.mr_program, mr_logfile)
-                continue
-            elif not os.path.isfile(ref_logfile):
-                logger.debug("Cannot find %s refine log file: %s", self.mr_program, ref_logfile)
-                continue
-            elif not os.path.isfile(mr_pdbout):
-                logger.debug("Cannot find %s output file: %s", self.mr_program, mr_pdbout)
-                continue
+        tasks = [(self.mr_program, self.refine_program, mr_logfile, mr_pdbout, ref_logfile)
+                 for mr_pdbout, mr_logfile, ref_logfile in run_files]
+        # Log parsing is independent per model, so spread it over the local processors if we have them.
+        # On a cluster nproc is the array size, not the number of cores on this host
+        processes = nproc if submit_qtype == "local" else 1
+        parsed = parallel_map(_parse_mr_logs, tasks, processes)
 
-            score = MrScore(pdb_code=result.pdb_code)
-
-            if self.mr_program == "molrep":
-                mp = molrep_parser.MolrepParser(mr_logfile)
-                score.molrep_score = mp.score
-                score.molrep_tfscore = mp.tfscore
-            elif self.mr_program == "phaser":
-                pp = phaser_parser.PhaserParser(mr_logfile)
-                score.phaser_tfz = pp.tfz
-                score.phaser_llg = pp.llg
-                score.phaser_rfz = pp.rfz
-
-            if self.anomalous_data_present():
-                try:
-                    work_dir = os.path.join(self.output_dir, result.pdb_code, "anomalous")
-                    anode = anomalous_util.AnodeSearch(self.mtz, work_dir)
-                    input_model = os.path.join(self.output_dir, result.pdb_code, "mr",
-                                               self.mr_program, "{0}_mr_output.pdb".format(result.pdb_code))
-                    anode.run(input_model)
-                    a = anode.search_results()
-                    score.dano_peak_height = a.dano_peak_height
-                    score.nearest_atom = a.nearest_atom
-                    self.dano_columns = ["dano_peak_height", "nearest_atom"]
-                except RuntimeError:
-                    logger.debug("RuntimeError: Unable to create DANO map for: %s", result.pdb_code)
-                except PyJobExecutionError:
-                    logger.debug("PyJobExecutionError: Unable to run exectute anode for: %s", result.pdb_code)
+        mr_results = [MrScore(pdb_code=result.pdb_code, **scores)
+                      for result, scores in zip(results, parsed) if scores is not None]
+        mr_pdbouts = [files[0] for files, scores in zip(run_files, parsed) if scores is not None]
 
-            if os.path.isfile(ref_logfile):
-                rp = refmac_parser.RefmacParser(ref_logfile)
-                score.final_r_free = rp.final_r_free
-                score.final_r_fact = rp.final_r_fact
-            else:
-                logger.debug("Cannot find %s log file: %s", self.refine_program, ref_logfile)
-            mr_results += [score]
+        if self.anomalous_data_present():
+            # Each ANODE run is a chain of external programs, so run one model per process at a time
+            tasks = [(self.mtz, os.path.join(self.output_dir, score.pdb_code, "anomalous"), mr_pdbout)
+                     for score, mr_pdbout in zip(mr_results, mr_pdbouts)]
+            peaks = parallel_map(_run_anode, tasks, processes, chunksize=1)
+            for i, peak in enumerate(peaks):
+                if peak is not None:
+                    mr_results[i] = mr_results[i]._replace(dano_peak_height=peak.dano_peak_height,
+                                                           nearest_atom=peak.nearest_atom)
+                    self.dano_columns = ["dano_peak_height", "nearest_atom"]
 
-        self._search_results = mr_results
+        # Sort once here rather than on every read of search_results
+        self._search_results = sorted(mr_results, key=operator.attrgetter("final_r_free"))
 
     def generate_script(self, result):
-        mr_workdir = os.path.join(self.output_dir, result.pdb_code, "mr", self.mr_program)
-        mr_logfile = os.path.join(mr_workdir, "{0}_mr.log".format(result.pdb_code))
-        mr_pdbout = os.path.join(mr_workdir, "{0}_mr_output.pdb".format(result.pdb_code))
-        mr_hklout = os.path.join(mr_workdir, "{0}_mr_output.mtz".format(result.pdb_code))
+        pdb_code = result.pdb_code
+        mr_workdir = os.path.join(self.output_dir, pdb_code, "mr", self.mr_program)
+        mr_logfile = os.path.join(mr_workdir, pdb_code + "_mr.log")
+        mr_pdbout = os.path.join(mr_workdir, pdb_code + "_mr_output.pdb")
+        mr_hklout = os.path.join(mr_workdir, pdb_code + "_mr_output.mtz")
 
         ref_workdir = os.path.join(mr_workdir, "refine")
-        ref_hklout = os.path.join(ref_workdir, "{0}_refinement_output.mtz".format(result.pdb_code))
-        ref_logfile = os.path.join(ref_workdir, "{0}_ref.log".format(result.pdb_code))
-        ref_pdbout = os.path.join(ref_workdir, "{0}_refinement_output.pdb".format(result.pdb_code))
+        ref_hklout = os.path.join(ref_workdir, pdb_code + "_refinement_output.mtz")
+        ref_logfile = os.path.join(ref_workdir, pdb_code + "_ref.log")
+        ref_pdbout = os.path.join(ref_workdir, pdb_code + "_refinement_output.pdb")
 
         if isinstance(result, (AmoreRotationScore, PhaserRotationScore)):
             pdb_struct = PdbStructure.from_file(result.dat_path)
@@ -400,24 +406,10 @@ class MrSubmit(object):
             self.sgalternative,
         ]
 
-        if self.mr_program == "molrep":
-            mr_cmd += ["-space_group", "".join(self.mtz_obj.spacegroup_symbol.encode("ascii").split())]
+        mr_cmd += self.mr_options
 
-        elif self.mr_program == "phaser":
-            mr_cmd += [
-                "-i",
-                self.mtz_obj.i,
-                "-sigi",
-                self.mtz_obj.sigi,
-                "-f",
-                self.mtz_obj.f,
-                "-sigf",
-                self.mtz_obj.sigf,
-                "-solvent",
-                solvent_content,
-                "-timeout",
-                self.timeout,
-            ]
+        if self.mr_program == "phaser":
+            mr_cmd += ["-solvent", solvent_content, "-timeout", self.timeout]
 
             if isinstance(result, LatticeSearchResult):
                 mr_cmd += ["-autohigh", 4.0, "-hires", 5.0]
@@ -452,13 +444,7 @@ class MrSubmit(object):
         # ====
         prefix, stem = self.mr_program + "_", result.pdb_code
 
-        ccp4_scr = os.environ["CCP4_SCR"]
-        if self.tmp_dir:
-            tmp_dir = os.path.join(self.tmp_dir)
-        else:
-            tmp_dir = os.path.join(self.output_dir)
-
-        source = source_ccp4()
+        source, tmp_dir, ccp4_scr = self.script_environment
 
         cmd = [
             [source],
@@ -474,6 +460,32 @@ class MrSubmit(object):
         run_files = (mr_pdbout, mr_logfile, ref_logfile)
         return run_script, run_files
 
+    def _mr_program_options(self):
+        """The MR program options that are the same for every model"""
+        if self.mr_program == "molrep":
+            return ["-space_group", "".join(self.mtz_obj.spacegroup_symbol.encode("ascii").split())]
+        elif self.mr_program == "phaser":
+            return [
+                "-i",
+                self.mtz_obj.i,
+                "-sigi",
+                self.mtz_obj.sigi,
+                "-f",
+                self.mtz_obj.f,
+                "-sigf",
+                self.mtz_obj.sigf,
+            ]
+        return []
+
+    def _script_environment(self):
+        """The CCP4 setup command, scratch directory for the jobs and original CCP4 scratch directory"""
+        ccp4_scr = os.environ["CCP4_SCR"]
+        if self.tmp_dir:
+            tmp_dir = os.path.join(self.tmp_dir)
+        else:
+            tmp_dir = os.path.join(self.output_dir)
+        return source_ccp4(), tmp_dir, ccp4_scr
+
     def existing_solution(self, results):
         """Function to check if a solution is has already been found
 
@@ -487,30 +499,32 @@ class MrSubmit(object):
         bool
             True/False depending on whether a solution is found amongst results
         """
-
+        # Only models with an output directory can have a previous solution, which on a
+        # fresh run saves a stat of every log file
+        existing = set(os.listdir(self.output_dir)) if os.path.isdir(self.output_dir) else set()
         for result in results:
+            if result.pdb_code not in existing:
+                continue
             mr_workdir = os.path.join(self.output_dir, result.pdb_code, "mr", self.mr_program)
             mr_logfile = os.path.join(mr_workdir, "{0}_mr.log".format(result.pdb_code))
             ref_workdir = os.path.join(mr_workdir, "refine")
             ref_logfile = os.path.join(ref_workdir, "{0}_ref.log".format(result.pdb_code))
             if os.path.isfile(ref_logfile):
-                rp = refmac_parser.RefmacParser(ref_logfile)
-                if _mr_job_succeeded(rp.final_r_fact, rp.final_r_free):
-                    score = MrScore(pdb_code=result.pdb_code)
-
+                final_r_fact, final_r_free = _refmac_final_r_factors(ref_logfile)
+                if _mr_job_succeeded(final_r_fact, final_r_free):
+                    scores = {}
                     if self.mr_program == "molrep":
                         mp = molrep_parser.MolrepParser(mr_logfile)
-                        score.molrep_score = mp.score
-                        score.molrep_tfscore = mp.tfscore
+                        scores["molrep_score"] = mp.score
+                        scores["molrep_tfscore"] = mp.tfscore
                     elif self.mr_program == "phaser":
                         pp = phaser_parser.PhaserParser(mr_logfile)
-                        score.phaser_tfz = pp.tfz
-                        score.phaser_llg = pp.llg
-                        score.phaser_rfz = pp.rfz
+                        scores["phaser_tfz"] = pp.tfz
+                        scores["phaser_llg"] = pp.llg
+                        scores["phaser_rfz"] = pp.rfz
 
-                    rp = refmac_parser.RefmacParser(ref_logfile)
-                    score.final_r_free = rp.final_r_free
-                    score.final_r_fact = rp.final_r_fact
+                    score = MrScore(pdb_code=result.pdb_code, final_r_fact=final_r_fact, final_r_free=final_r_free,
+                                    **scores)
                     self._search_results = [score]
                     return True
         return False
@@ -561,6 +575,99 @@ class MrSubmit(object):
         summarize_result(self.search_results, csv_file=csv_file, columns=columns)
 
 
+def _run_anode(task):
+    """Create a phased anomalous fourier map for a single MR solution
+
+    Parameters
+    ----------
+    task : tuple
+       The input MTZ, the ANODE working directory and the MR output PDB
+
+    Returns
+    -------
+    :obj:`~simbad.core.anode_score.AnomScore`
+       The anomalous peak scores, or None if ANODE could not be run
+
+    """
+    mtz, work_dir, input_model = task
+    try:
+        anode = anomalous_util.AnodeSearch(mtz, work_dir)
+        anode.run(input_model)
+        return anode.search_results()
+    except RuntimeError:
+        logger.debug("RuntimeError: Unable to create DANO map for: %s", input_model)
+    except PyJobExecutionError:
+        logger.debug("PyJobExecutionError: Unable to run exectute anode for: %s", input_model)
+    return None
+
+
+def _parse_mr_logs(task):
+    """Parse the MR and refinement log files of a single model
+
+    Parameters
+    ----------
+    task : tuple
+       The MR program, refinement program, MR log file, MR output PDB and refinement log file
+
+    Returns
+    -------
+    dict
+       The :obj:`~simbad.core.mr_score.MrScore` attributes read from the log files, or
+       None if any of the files is missing
+
+    """
+    mr_program, refine_program, mr_logfile, mr_pdbout, ref_logfile = task
+    if not os.path.isfile(mr_logfile):
+        logger.debug("Cannot find %s MR log file: %s", mr_program, mr_logfile)
+        return None
+    elif not os.path.isfile(ref_logfile):
+        logger.debug("Cannot find %s refine log file: %s", refine_program, ref_logfile)
+        return None
+    elif not os.path.isfile(mr_pdbout):
+        logger.debug("Cannot find %s output file: %s", mr_program, mr_pdbout)
+        return None
+
+    scores = {}
+    if mr_program == "molrep":
+        mp = molrep_parser.MolrepParser(mr_logfile)
+        scores["molrep_score"] = mp.score
+        scores["molrep_tfscore"] = mp.tfscore
+    elif mr_program == "phaser":
+        pp = phaser_parser.PhaserParser(mr_logfile)
+        scores["phaser_tfz"] = pp.tfz
+        scores["phaser_llg"] = pp.llg
+        scores["phaser_rfz"] = pp.rfz
+
+    scores["final_r_fact"], scores["final_r_free"] = _refmac_final_r_factors(ref_logfile)
+    return scores
+
+
+def _refmac_final_r_factors(logfile):
+    """Get the final R factor and R free from a refinement log file
+
+    The log files are read once by the success check during job submission and again
+    when scoring, so results are cached until the file changes.
+
+    Parameters
+    ----------
+    logfile : str
+       The path to a refmac log file
+
+    Returns
+    -------
+    tuple
+       The final R factor and R free
+
+    """
+    return _REFMAC_CACHE.cached(logfile, _read_refmac_final_r_factors)
+
+
+def _read_refmac_final_r_factors(logfile):
+    """Parse the final R factor and R free from a refinement log file"""
+    rp = refmac_parser.RefmacParser(logfile)
+    return rp.final_r_fact, rp.final_r_free
+
+
 def _mr_job_succeeded(r_fact, r_free):
     """Check values for job success"""
     return r_fact < 0.45 and r_free < 0.45
@@ -576,6 +683,16 @@ def _phaser_succeeded(llg, tfz):
     return llg > 120 and tfz > 8
 
 
+def _refinements_succeeded(r_facts, r_frees):
+    """Check arrays of values for job success, see :func:`_refinement_succeeded`"""
+    return (r_facts < 0.45) & (r_frees < 0.45)
+
+
+def _phasers_succeeded(llgs, tfzs):
+    """Check arrays of values for job success, see :func:`_phaser_succeeded`"""
+    return (llgs > 120) & (tfzs > 8)
+
+
 def mr_succeeded_log(log):
     """Check a Molecular Replacement job for it's success
 
@@ -593,8 +710,7 @@ def mr_succeeded_log(log):
     mr_prog, pdb = os.path.basename(log).replace(".log", "").split("_", 1)
     refmac_log = os.path.join(os.path.dirname(log), pdb, "mr", mr_prog, "refine", pdb + "_ref.log")
     if os.path.isfile(refmac_log):
-        rp = refmac_parser.RefmacParser(refmac_log)
-        return _mr_job_succeeded(rp.final_r_fact, rp.final_r_free)
+        return _mr_job_succeeded(*_refmac_final_r_factors(refmac_log))
     return False
 
 
@@ -614,11 +730,9 @@ def mr_succeeded_csvfile(f):
     """
     import pandas as pd
 
-    df = pd.read_csv(f)
-    try:
-        data = zip(df.final_r_fact.tolist(), df.final_r_free.tolist(), df.phaser_llg.tolist(), df.phaser_tfz.tolist())
-        return any(_refinement_succeeded(rfact, rfree) or
-                   _phaser_succeeded(llg, tfz) for rfact, rfree, llg, tfz in data)
-    except AttributeError:
-        data = zip(df.final_r_fact.tolist(), df.final_r_free.tolist())
-        return any(_refinement_succeeded(rfact, rfree) for rfact, rfree in data)
+    columns = ("final_r_fact", "final_r_free", "phaser_llg", "phaser_tfz")
+    df = pd.read_csv(f, usecols=lambda c: c in columns)
+    succeeded = _refinements_succeeded(df.final_r_fact.values, df.final_r_free.values)
+    if "phaser_llg" in df.columns and "phaser_tfz" in df.columns:
+        succeeded |= _phasers_succeeded(df.phaser_llg.values, df.phaser_tfz.values)
+    return bool(succeeded.any())
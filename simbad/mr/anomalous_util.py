@@ -15,6 +15,7 @@ from pyjob import cexec
 
 from simbad.core.anode_score import AnomScore
 from simbad.parsers import anode_parser, mtz_parser
+from simbad.util import mkdir_p
 
 logger = logging.getLogger(__name__)
 
@@ -54,8 +55,7 @@ class AnodeSearch(object):
     def mtz(self, mtz):
         """Define the input MTZ file"""
         self._mtz = os.path.abspath(mtz)
-        self._mtz_obj = mtz_parser.MtzParser(mtz)
-        self._mtz_obj.parse()
+        self._mtz_obj = mtz_parser.parsed_mtz(mtz)
 
     @property
     def mtz_obj(self):
@@ -74,8 +74,7 @@ class AnodeSearch(object):
 
     def run(self, input_model, cleanup=True):
         """Function to run ANODE to create phased anomalous fourier map"""
-        if not os.path.isdir(self.work_dir):
-            os.mkdir(self.work_dir)
+        mkdir_p(self.work_dir)
 
         self.name = os.path.basename(input_model).split(".")[0]
         cwd = os.getcwd()
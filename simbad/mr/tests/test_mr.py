@@ -0,0 +1,107 @@
+"""Test functions for simbad.mr"""
+
+__author__ = "Adam Simpkin"
+__date__ = "14 Oct 2026"
+
+import os
+import numpy as np
+import tempfile
+import unittest
+import simbad.mr
+
+REFMAC_LOG = """
+ $TEXT:Result: $$ Final results $$
+                      Initial    Final
+           R factor    {0}   {0}
+             R free    {1}   {1}
+"""
+
+
+class Test(unittest.TestCase):
+    """Unit test"""
+
+    def test_refmac_final_r_factors_1(self):
+        """Test case for simbad.mr._refmac_final_r_factors"""
+
+        refmac_log = tempfile.NamedTemporaryFile("w", delete=False)
+        refmac_log.write(REFMAC_LOG.format(0.2666, 0.2659))
+        refmac_log.close()
+
+        data = simbad.mr._refmac_final_r_factors(refmac_log.name)
+        self.assertEqual(data, (0.2666, 0.2659))
+
+        # Rewriting the log must not return the cached R factors
+        with open(refmac_log.name, "w") as f_out:
+            f_out.write(REFMAC_LOG.format(0.41234, 0.44321))
+        data = simbad.mr._refmac_final_r_factors(refmac_log.name)
+        os.unlink(refmac_log.name)
+
+        self.assertEqual(data, (0.41234, 0.44321))
+
+    def test_mr_succeeded_csvfile_1(self):
+        """Test case for simbad.mr.mr_succeeded_csvfile"""
+
+        # Refinement scores only
+        content = """pdb_code,final_r_fact,final_r_free
+1E10,0.47,0.51
+1DTX,0.32,0.37"""
+        self.assertTrue(self._mr_succeeded_csvfile(content))
+
+    def test_mr_succeeded_csvfile_2(self):
+        """Test case for simbad.mr.mr_succeeded_csvfile"""
+
+        # Refinement failed everywhere, but phaser found a solution
+        content = """pdb_code,phaser_tfz,phaser_llg,phaser_rfz,final_r_fact,final_r_free
+1E10,8.1,120.5,4.2,0.47,0.51
+1DTX,12.3,310.2,5.9,0.52,0.55
+2FBB,,,,,"""
+        self.assertTrue(self._mr_succeeded_csvfile(content))
+
+    def test_mr_succeeded_csvfile_3(self):
+        """Test case for simbad.mr.mr_succeeded_csvfile"""
+
+        # No row passes either check
+        content = """pdb_code,phaser_tfz,phaser_llg,phaser_rfz,final_r_fact,final_r_free
+1E10,7.9,120.5,4.2,0.47,0.51
+1DTX,12.3,95.1,5.9,0.45,0.45
+2FBB,,,,,"""
+        self.assertFalse(self._mr_succeeded_csvfile(content))
+
+        content = """pdb_code,final_r_fact,final_r_free
+1E10,0.47,0.51
+1DTX,0.32,0.45"""
+        self.assertFalse(self._mr_succeeded_csvfile(content))
+
+    def test_refinements_succeeded_1(self):
+        """Test case for simbad.mr._refinements_succeeded"""
+
+        r_facts = np.array([0.32, 0.45, 0.4499, 0.32, np.nan])
+        r_frees = np.array([0.45, 0.32, 0.4499, 0.44, 0.32])
+        data = simbad.mr._refinements_succeeded(r_facts, r_frees)
+        reference_data = [simbad.mr._refinement_succeeded(r_fact, r_free) for r_fact, r_free in zip(r_facts, r_frees)]
+
+        self.assertEqual(data.tolist(), [False, False, True, True, False])
+        self.assertEqual(data.tolist(), reference_data)
+
+    def test_phasers_succeeded_1(self):
+        """Test case for simbad.mr._phasers_succeeded"""
+
+        llgs = np.array([120.0, 120.01, 310.2, 310.2, np.nan])
+        tfzs = np.array([12.3, 12.3, 8.0, 8.01, 12.3])
+        data = simbad.mr._phasers_succeeded(llgs, tfzs)
+        reference_data = [simbad.mr._phaser_succeeded(llg, tfz) for llg, tfz in zip(llgs, tfzs)]
+
+        self.assertEqual(data.tolist(), [False, True, False, True, False])
+        self.assertEqual(data.tolist(), reference_data)
+
+    def _mr_succeeded_csvfile(self, content):
+        csv_temp_file = tempfile.NamedTemporaryFile("w", delete=False)
+        csv_temp_file.write(content)
+        csv_temp_file.close()
+        data = simbad.mr.mr_succeeded_csvfile(csv_temp_file.name)
+        os.unlink(csv_temp_file.name)
+        return data
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,10 @@ import gemmi
 from enum import Enum
 
 import simbad.parsers
+import simbad.util
+
+# Parsed MTZ files
+_PARSED_MTZ = simbad.util.FileCache(maxsize=8)
 
 
 class MtzColumnLabels(Enum):
@@ -86,9 +90,14 @@ class MtzParser(simbad.parsers._Parser):
                 self.i_plus, self.sigi_plus, self.f_minus, self.sigf_minus, self.i_minus, self.sigi_minus)
 
     def read_reflections(self):
-        """Read the reflection data data"""
-
-        self.reflection_file = gemmi.read_mtz_file(self.fname)
+        """Read the reflection file headers"""
+
+        # Everything we need is in the header, so skip loading the reflections themselves
+        try:
+            self.reflection_file = gemmi.read_mtz_file(self.fname, with_data=False)
+        except TypeError:
+            # Older gemmi releases always read the data
+            self.reflection_file = gemmi.read_mtz_file(self.fname)
         self.nreflections = self.reflection_file.nreflections
         self.spacegroup_symbol = self.reflection_file.spacegroup.hm
         self.resolution = self.reflection_file.resolution_high()
@@ -111,3 +120,30 @@ class MtzParser(simbad.parsers._Parser):
         if not any([label for label in self.summary if label is not None]):
             self.logger.error('Cannot find any column names at %s' % self.fname)
             self.error = True
+
+
+def parsed_mtz(fname):
+    """Get a parsed :obj:`MtzParser` for an MTZ file
+
+    The same input MTZ is read by every MR and anomalous map job set up during a search,
+    so parsed files are shared until the file changes on disk. The returned object must
+    not be modified.
+
+    Parameters
+    ----------
+    fname : str
+       The path to the MTZ file
+
+    Returns
+    -------
+    :obj:`MtzParser`
+
+    """
+    return _PARSED_MTZ.cached(fname, _read_mtz)
+
+
+def _read_mtz(fname):
+    """Parse an MTZ file"""
+    mtz_obj = MtzParser(fname)
+    mtz_obj.parse()
+    return mtz_obj
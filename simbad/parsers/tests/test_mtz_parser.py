@@ -2,7 +2,7 @@ import os
 import numpy as np
 import unittest
 
-from simbad.parsers.mtz_parser import MtzParser
+from simbad.parsers.mtz_parser import MtzParser, parsed_mtz
 
 try:
     ROOT_DIR = os.environ['SIMBAD_ROOT']
@@ -73,5 +73,10 @@ class Test(unittest.TestCase):
         self.assertEqual(mp.sigf_minus, "SIGFPTNCD25(-)")
         self.assertEqual(mp.free, "FreeR_flag")
 
-
-
+    def test_parsed_mtz_1(self):
+        """Test case for parsed_mtz"""
+        input_mtz = os.path.join(EXAMPLE_DIR, "toxd", "toxd.mtz")
+        mp = parsed_mtz(input_mtz)
+        self.assertEqual(mp.f, "FTOXD3")
+        self.assertEqual(mp.sigf, "SIGFTOXD3")
+        self.assertIs(parsed_mtz(input_mtz), mp)
@@ -15,8 +15,7 @@ class _RotationSearch(ABC):
         self.max_to_keep = max_to_keep
         self.mr_program = mr_program
         self.mtz = mtz
-        self.mtz_obj = simbad.parsers.mtz_parser.MtzParser(mtz)
-        self.mtz_obj.parse()
+        self.mtz_obj = simbad.parsers.mtz_parser.parsed_mtz(mtz)
         self.skip_mr = skip_mr
         self.process_all = process_all
         self.tmp_dir = tmp_dir
@@ -25,11 +24,12 @@ class _RotationSearch(ABC):
         self.columns = []
         self.score_column = None
         self.simbad_dat_files = None
+        self._dat_by_code = {}
         self.solution = False
         self.submit_qtype = None
         self.submit_queue = None
         self._search_results = None
-        self.tested = []
+        self.tested = set()
 
     # ------------------ Abstract methods and properties ------------------
 
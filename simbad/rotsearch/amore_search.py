@@ -6,6 +6,7 @@ __version__ = "0.4"
 
 import glob
 import logging
+import operator
 import os
 import shutil
 import uuid
@@ -79,6 +80,8 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
         self.npic = None
         self.rotastep = None
         self.ccp4_scr = None
+        self.ccp4_source = None
+        self._rot_scores = simbad.util.FileCache()
         self.script_log_dir = None
 
         self.columns = [
@@ -161,6 +164,7 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
         self.submit_queue = submit_queue
 
         self.simbad_dat_files = simbad.db.find_simbad_dat_files(models_dir)
+        self._dat_by_code = {os.path.basename(p.replace(".dat", "")): p for p in self.simbad_dat_files}
 
         i = InputMR_DAT()
         i.setHKLI(self.mtz)
@@ -170,13 +174,14 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
 
         sol_calc = simbad.util.matthews_prob.SolventContent(self.mtz_obj.cell.volume_per_image())
 
-        dir_name = "simbad-tmp-" + str(uuid.uuid1())
+        dir_name = "simbad-tmp-" + uuid.uuid4().hex
         self.script_log_dir = os.path.join(self.work_dir, dir_name)
         os.mkdir(self.script_log_dir)
 
         self.hklpck0 = self._generate_hklpck0()
 
         self.ccp4_scr = os.environ["CCP4_SCR"]
+        self.ccp4_source = simbad.util.source_ccp4()
         default_tmp_dir = os.path.join(self.work_dir, "tmp")
         if self.tmp_dir:
             self.template_tmp_dir = os.path.join(self.tmp_dir, dir_name + "-{0}")
@@ -194,41 +199,27 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
             if run_cca.Success():
                 predicted_molecular_weight = run_cca.getAssemblyMW()
 
-        dat_models = []
-        for dat_model in self.simbad_dat_files:
-            name = os.path.basename(dat_model.replace(".dat", ""))
-            try:
-                pdb_struct = simbad.util.pdb_util.PdbStructure.from_file(dat_model)
-            except Exception: # Catch all issues here
-                msg = "Skipping %s: Problem with dat file"
-                logger.debug(msg, name)
-                continue
-            solvent_fraction = sol_calc.calculate_from_struct(pdb_struct)
-            solvent_content = solvent_fraction * 100
-            if solvent_content < min_solvent_content:
-                msg = "Skipping %s: solvent content is predicted to be less than %.2f"
-                logger.debug(msg, name, min_solvent_content)
-                continue
-            x, y, z, intrad = pdb_struct.integration_box
-            model_molecular_weight = pdb_struct.molecular_weight
-            mw_diff = abs(predicted_molecular_weight - model_molecular_weight)
-
-            info = simbad.core.dat_score.DatModelScore(name, dat_model, mw_diff, x, y, z, intrad, solvent_content, None)
-            dat_models.append(info)
-
-        sorted_dat_models = sorted(dat_models, key=lambda x: float(x.mw_diff), reverse=False)
+        # Reading the models dominates the set up of large searches, use the local processors if we have them
+        processes = nproc if submit_qtype == "local" else 1
+        tasks = [(dat_model, sol_calc, min_solvent_content, predicted_molecular_weight)
+                 for dat_model in self.simbad_dat_files]
+        dat_models = [info for info in simbad.util.parallel_map(_dat_model_score, tasks, processes) if info is not None]
+
+        sorted_dat_models = sorted(dat_models, key=operator.attrgetter("mw_diff"))
         n_files = len(sorted_dat_models)
         chunk_size = simbad.rotsearch.get_chunk_size(n_files, chunk_size)
         total_chunk_cycles = simbad.rotsearch.get_total_chunk_cycles(n_files, chunk_size)
+        # Only the scores of the chunk being run are ever looked up
+        self._rot_scores = simbad.util.FileCache(maxsize=max(1, chunk_size))
 
         results = []
         iteration_range = range(0, n_files, chunk_size)
         for cycle, i in enumerate(iteration_range):
-            logger.info("Working on chunk %d out of %d", cycle + 1, total_chunk_cycles)
-
             if self.solution:
-                logger.info("Early termination criteria met, skipping chunk %d", cycle + 1)
-                continue
+                logger.info("Early termination criteria met, skipping chunks %d to %d", cycle + 1, total_chunk_cycles)
+                break
+
+            logger.info("Working on chunk %d out of %d", cycle + 1, total_chunk_cycles)
 
             collector = ScriptCollector(None)
             amore_files = []
@@ -246,30 +237,7 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
                     self.rot_succeeded_log
                 )
 
-                for dat_model, amore_log in zip(dat_models, amore_logs):
-                    base = os.path.basename(amore_log)
-                    pdb_code = base.replace("amore_", "").replace(".log", "")
-                    try:
-                        rotsearch_parser = simbad.parsers.rotsearch_parser.AmoreRotsearchParser(amore_log)
-                        score = simbad.core.amore_score.AmoreRotationScore(
-                            pdb_code,
-                            dat_model,
-                            rotsearch_parser.alpha,
-                            rotsearch_parser.beta,
-                            rotsearch_parser.gamma,
-                            rotsearch_parser.cc_f,
-                            rotsearch_parser.rf_f,
-                            rotsearch_parser.cc_i,
-                            rotsearch_parser.cc_p,
-                            rotsearch_parser.icp,
-                            rotsearch_parser.cc_f_z_score,
-                            rotsearch_parser.cc_p_z_score,
-                            rotsearch_parser.num_of_rot,
-                        )
-                        if rotsearch_parser.cc_f_z_score:
-                            results += [score]
-                    except IOError:
-                        pass
+                results += self._chunk_results(amore_logs, dat_models)
 
             else:
                 logger.critical("No structures to be trialled")
@@ -280,6 +248,35 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
         if os.path.isdir(default_tmp_dir):
             shutil.rmtree(default_tmp_dir)
 
+    def _chunk_results(self, amore_logs, dat_models):
+        """Get the rotation scores of a finished chunk
+
+        Logs already parsed by :meth:`rot_succeeded_log` are not read again, unless the
+        job was still writing to them when they were parsed.
+
+        Parameters
+        ----------
+        amore_logs : list
+           The paths to the AMORE logs of the chunk
+        dat_models : list
+           The paths to the dat models the logs were run on
+
+        Returns
+        -------
+        list
+           The :obj:`~simbad.core.amore_score.AmoreRotationScore` of each log with a CC_F Z-score
+
+        """
+        results = []
+        for amore_log, dat_model in zip(amore_logs, dat_models):
+            score = self._rot_scores.pop(amore_log)
+            if score is None:
+                # The logs are small, a process pool per chunk would cost more than the parsing
+                score = _parse_amore_log((amore_log, dat_model))
+            if score is not None and score.CC_F_Z_score:
+                results.append(score)
+        return results
+
     def generate_script(self, dat_model):
         logger.debug("Generating script to perform AMORE rotation " + "function on %s", dat_model.pdb_code)
 
@@ -302,10 +299,8 @@ class AmoreRotationSearch(simbad.rotsearch._RotationSearch):
 
         tmp_dir = self.template_tmp_dir.format(dat_model.pdb_code)
 
-        source = simbad.util.source_ccp4()
-
         cmd = [
-            [source],
+            [self.ccp4_source],
             [EXPORT, "CCP4_SCR=" + tmp_dir],
             [MKDIR_CMD, CCP4_SCRATCH, os.linesep],
             [CMD_PREFIX, CCP4_SOURCE + "/bin/ccp4-python", "-c", conv_py, os.linesep],
@@ -415,8 +410,10 @@ ROTA  CROSS  MODEL 1  PKLIM {pklim}  NPIC {npic} STEP {step}"""
             return False
 
         rot_prog, pdb = os.path.basename(log).replace(".log", "").split("_", 1)
+        # Taken before parsing so a log that grows in the meantime is never matched
+        signature = simbad.util.file_signature(log)
         rotsearch_parser = simbad.parsers.rotsearch_parser.AmoreRotsearchParser(log)
-        dat_model = [s for s in self.simbad_dat_files if pdb in s][0]
+        dat_model = self._dat_by_code[pdb]
         score = simbad.core.amore_score.AmoreRotationScore(
             pdb,
             dat_model,
@@ -432,6 +429,7 @@ ROTA  CROSS  MODEL 1  PKLIM {pklim}  NPIC {npic} STEP {step}"""
             rotsearch_parser.cc_p_z_score,
             rotsearch_parser.num_of_rot,
         )
+        self._rot_scores.set(log, score, signature)
         results = [score]
         try:
             job_succeeded = self._rot_job_succeeded(rotsearch_parser.cc_f_z_score)
@@ -439,7 +437,7 @@ ROTA  CROSS  MODEL 1  PKLIM {pklim}  NPIC {npic} STEP {step}"""
             return False
 
         if job_succeeded and pdb not in self.tested:
-            self.tested.append(pdb)
+            self.tested.add(pdb)
             output_dir = os.path.join(self.work_dir, "mr_search")
             mr = simbad.mr.MrSubmit(
                 mtz=self.mtz,
@@ -480,3 +478,82 @@ ROTA  CROSS  MODEL 1  PKLIM {pklim}  NPIC {npic} STEP {step}"""
         if percentage_complete - self.progress >= 5:
             logger.info("Percentage complete: {:.1f}%".format(percentage_complete))
             self.progress = percentage_complete
+
+
+def _dat_model_score(task):
+    """Check whether a dat model fits the unit cell and get its rotation search parameters
+
+    Parameters
+    ----------
+    task : tuple
+       The dat model, a :obj:`~simbad.util.matthews_prob.SolventContent` for the unit cell,
+       the minimum solvent content and the predicted molecular weight of the crystal contents
+
+    Returns
+    -------
+    :obj:`~simbad.core.dat_score.DatModelScore`
+       The model info, or None if the model should be skipped
+
+    """
+    dat_model, sol_calc, min_solvent_content, predicted_molecular_weight = task
+    name = os.path.basename(dat_model.replace(".dat", ""))
+    try:
+        pdb_struct = simbad.util.pdb_util.PdbStructure.from_file(dat_model)
+    except Exception:  # Catch all issues here
+        msg = "Skipping %s: Problem with dat file"
+        logger.debug(msg, name)
+        return None
+    # The molecular weight is a per-atom loop, so only work it out once
+    model_molecular_weight = pdb_struct.molecular_weight
+    try:
+        solvent_content = sol_calc.calculate_from_molecular_weight(model_molecular_weight) * 100
+    except ValueError:
+        msg = "Skipping %s: Incorrect molecular weight"
+        logger.debug(msg, name)
+        return None
+    if solvent_content < min_solvent_content:
+        msg = "Skipping %s: solvent content is predicted to be less than %.2f"
+        logger.debug(msg, name, min_solvent_content)
+        return None
+    x, y, z, intrad = pdb_struct.integration_box
+    mw_diff = abs(predicted_molecular_weight - model_molecular_weight)
+    return simbad.core.dat_score.DatModelScore(name, dat_model, mw_diff, x, y, z, intrad, solvent_content, None)
+
+
+def _parse_amore_log(task):
+    """Parse an AMORE rotation search log
+
+    Parameters
+    ----------
+    task : tuple
+       The path to the AMORE log and the path to the dat model it was run on
+
+    Returns
+    -------
+    :obj:`~simbad.core.amore_score.AmoreRotationScore`
+       The rotation score, or None if the log is missing or has no CC_F Z-score
+
+    """
+    amore_log, dat_model = task
+    pdb_code = os.path.basename(amore_log).replace("amore_", "").replace(".log", "")
+    try:
+        rotsearch_parser = simbad.parsers.rotsearch_parser.AmoreRotsearchParser(amore_log)
+    except IOError:
+        return None
+    if not rotsearch_parser.cc_f_z_score:
+        return None
+    return simbad.core.amore_score.AmoreRotationScore(
+        pdb_code,
+        dat_model,
+        rotsearch_parser.alpha,
+        rotsearch_parser.beta,
+        rotsearch_parser.gamma,
+        rotsearch_parser.cc_f,
+        rotsearch_parser.rf_f,
+        rotsearch_parser.cc_i,
+        rotsearch_parser.cc_p,
+        rotsearch_parser.icp,
+        rotsearch_parser.cc_f_z_score,
+        rotsearch_parser.cc_p_z_score,
+        rotsearch_parser.num_of_rot,
+    )
@@ -6,6 +6,7 @@ __version__ = "0.4"
 
 import glob
 import logging
+import operator
 import os
 import shutil
 import uuid
@@ -65,6 +66,7 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
                                                    max_to_keep=max_to_keep, skip_mr=skip_mr, process_all=process_all)
         self.eid = eid
         self.ccp4_scr = None
+        self.ccp4_source = None
         self.script_log_dir = None
 
         self.columns = ['llg', 'rfz']
@@ -109,6 +111,7 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
         self.submit_queue = submit_queue
 
         self.simbad_dat_files = simbad.db.find_simbad_dat_files(models_dir)
+        self._dat_by_code = {os.path.basename(p.replace(".dat", "")): p for p in self.simbad_dat_files}
 
         i = InputMR_DAT()
         i.setHKLI(self.mtz)
@@ -118,11 +121,12 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
 
         mat_prob = simbad.util.matthews_prob.MatthewsProbability(self.mtz_obj.cell.volume_per_image())
 
-        dir_name = "simbad-tmp-" + str(uuid.uuid1())
+        dir_name = "simbad-tmp-" + uuid.uuid4().hex
         self.script_log_dir = os.path.join(self.work_dir, dir_name)
         os.mkdir(self.script_log_dir)
 
         self.ccp4_scr = os.environ["CCP4_SCR"]
+        self.ccp4_source = simbad.util.source_ccp4()
         default_tmp_dir = os.path.join(self.work_dir, "tmp")
         if self.tmp_dir:
             self.template_tmp_dir = os.path.join(self.tmp_dir, dir_name + "-{0}")
@@ -161,7 +165,7 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
                                                        solvent_fraction, n_copies)
             dat_models.append(info)
 
-        sorted_dat_models = sorted(dat_models, key=lambda x: float(x.mw_diff), reverse=False)
+        sorted_dat_models = sorted(dat_models, key=operator.attrgetter("mw_diff"))
         n_files = len(sorted_dat_models)
         chunk_size = simbad.rotsearch.get_chunk_size(n_files, chunk_size)
         total_chunk_cycles = simbad.rotsearch.get_total_chunk_cycles(n_files, chunk_size)
@@ -169,11 +173,11 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
         results = []
         iteration_range = range(0, n_files, chunk_size)
         for cycle, i in enumerate(iteration_range):
-            logger.info("Working on chunk %d out of %d", cycle + 1, total_chunk_cycles)
-
             if self.solution:
-                logger.info("Early termination criteria met, skipping chunk %d", cycle + 1)
-                continue
+                logger.info("Early termination criteria met, skipping chunks %d to %d", cycle + 1, total_chunk_cycles)
+                break
+
+            logger.info("Working on chunk %d out of %d", cycle + 1, total_chunk_cycles)
 
             self.template_model = os.path.join(CCP4_SCRATCH, "{0}.pdb")
 
@@ -258,10 +262,8 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
         ]
         phaser_cmd = " ".join(str(e) for e in phaser_cmd)
 
-        source = simbad.util.source_ccp4()
-
         cmd = [
-            [source],
+            [self.ccp4_source],
             [EXPORT, "CCP4_SCR=" + tmp_dir],
             [MKDIR_CMD, CCP4_SCRATCH, os.linesep],
             [CMD_PREFIX, CCP4_SOURCE + "/bin/ccp4-python", "-c", conv_py, os.linesep],
@@ -302,12 +304,12 @@ class PhaserRotationSearch(simbad.rotsearch._RotationSearch):
 
         rot_prog, pdb = os.path.basename(log).replace(".log", "").split("_", 1)
         rotsearch_parser = simbad.parsers.rotsearch_parser.PhaserRotsearchParser(log)
-        dat_model = [s for s in self.simbad_dat_files if pdb in s][0]
+        dat_model = self._dat_by_code[pdb]
         score = simbad.core.phaser_score.PhaserRotationScore(pdb, dat_model, rotsearch_parser.llg, rotsearch_parser.rfz)
         results = [score]
         if self._rot_job_succeeded(rotsearch_parser.rfz) or rotsearch_parser.rfact:
             if pdb not in self.tested:
-                self.tested.append(pdb)
+                self.tested.add(pdb)
                 output_dir = os.path.join(self.work_dir, "mr_search")
                 mr = simbad.mr.MrSubmit(
                     mtz=self.mtz,
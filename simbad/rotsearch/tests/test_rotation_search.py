@@ -4,6 +4,8 @@ __author__ = "Adam Simpkin"
 __date__ = "16 Aug 2017"
 
 import os
+import shutil
+import tempfile
 import unittest
 import simbad.rotsearch.amore_search
 import simbad.rotsearch.phaser_search
@@ -106,6 +108,31 @@ SAMPLE 1 RESO 2.5 SHANN 2.5 SCALE 4.0"""
 
         self.assertFalse(data)
 
+    def test_chunk_results_1(self):
+        """Test case for AmoreRotationSearch._chunk_results"""
+        mtz = os.path.join(EXAMPLE_DIR, "toxd", "toxd.mtz")
+        rotation_search = simbad.rotsearch.amore_search.AmoreRotationSearch(mtz, "molrep", "tmp_dir", "work_dir")
+        log_dir = tempfile.mkdtemp()
+        amore_log = os.path.join(log_dir, "amore_1abc.log")
+        dat_model = os.path.join(log_dir, "1abc.dat")
+        rotation_search._dat_by_code = {"1abc": dat_model}
+
+        # The job is still running, so the log has no solution yet
+        with open(amore_log, "w") as f_out:
+            f_out.write(" ROTATION FUNCTION\n")
+        self.assertFalse(rotation_search.rot_succeeded_log(amore_log))
+
+        with open(amore_log, "a") as f_out:
+            f_out.write(" SOLUTIONRCD   1    0.46   88.40  116.18  0.0000  0.0000  0.0000  7.9 60.7 10.3  3.8   1  3.9  2.2  1\n")
+        data = rotation_search._chunk_results([amore_log], [dat_model])
+        shutil.rmtree(log_dir)
+
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0].pdb_code, "1abc")
+        self.assertEqual(data[0].dat_path, dat_model)
+        self.assertEqual(data[0].CC_F_Z_score, 3.9)
+        self.assertEqual(data[0].Number_of_rotation_searches_producing_peak, 1.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,10 +4,14 @@ __author__ = "Adam Simpkin, Felix Simkovic & Jens Thomas"
 __date__ = "05 May 2017"
 __version__ = "1.0"
 
+import collections
+import csv
+import errno
 import glob
 import json
 import logging
 import math
+import multiprocessing
 import os
 import pandas as pd
 import shutil
@@ -85,12 +89,52 @@ def result_by_score_from_csv(f, score, ascending=True):
     return df.loc[0, ["pdb_code", score]].tolist()
 
 
+def best_result_from_csv(f, score, ascending=True):
+    """Return the result with the best defined score in a single pass over the CSV file
+
+    Unlike :func:`result_by_score_from_csv`, the file is streamed row by row rather than
+    loaded into a :obj:`~pandas.DataFrame`, and rows with no value for ``score`` are skipped.
+
+    Parameters
+    ----------
+    f : str
+       The path to the CSV file
+    score : str
+       The column label of the score
+    ascending : bool, optional
+       Lower scores are better [default: True]
+
+    Returns
+    -------
+    list
+       The PDB code and score of the best result, or None if no row has a score
+
+    """
+    best = None
+    with open(f, "r") as f_in:
+        for row in csv.DictReader(f_in):
+            try:
+                value = float(row[score])
+            except (TypeError, ValueError):
+                continue
+            if value != value:
+                continue
+            if best is None or (value < best[1] if ascending else value > best[1]):
+                best = [row["pdb_code"], value]
+    return best
+
+
 def summarize_result(results, csv_file=None, columns=None):
     """Summarize the search results"""
-    kwargs = {}
+    # The records must come from _asdict(), LatticeSearchResult flattens its unit cell there
+    records = [r._asdict() for r in results]
     if columns:
-        kwargs["columns"] = ["pdb_code"] + columns
-    df = pd.DataFrame([r._asdict() for r in results], **kwargs)
+        # Build the frame column by column so pandas does not have to infer the keys of every row
+        columns = ["pdb_code"] + columns
+        data = {c: [record.get(c, float("nan")) for record in records] for c in columns}
+        df = pd.DataFrame(data, columns=columns)
+    else:
+        df = pd.DataFrame(records)
     df.set_index("pdb_code", inplace=True)
 
     if csv_file:
@@ -103,6 +147,152 @@ def summarize_result(results, csv_file=None, columns=None):
         logger.info("The results for this search are:\n\n%s\n", df.to_string())
 
 
+def mkdir_p(path):
+    """Create a directory and any missing parents, like ``mkdir -p``
+
+    Parameters
+    ----------
+    path : str
+       The path to the directory
+
+    Raises
+    ------
+    OSError
+       The path exists but is not a directory, or cannot be created
+
+    """
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(path):
+            raise
+
+
+def file_signature(fname):
+    """The modification time and size of a file
+
+    Parameters
+    ----------
+    fname : str
+       The path to the file
+
+    Returns
+    -------
+    tuple
+       The modification time and size, or None if the file cannot be read
+
+    """
+    try:
+        stat = os.stat(fname)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+class FileCache(object):
+    """A bounded cache of values read from files
+
+    Each value is stored with the :func:`file_signature` of its file and is only returned
+    while the file is unchanged. Once ``maxsize`` values are held the oldest is dropped.
+
+    Examples
+    --------
+    >>> from simbad.util import FileCache
+    >>> cache = FileCache(maxsize=8)
+    >>> value = cache.cached('<fname>', '<func>')
+
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drop all cached values"""
+        self._entries.clear()
+
+    def get(self, fname, default=None):
+        """The cached value for a file, or ``default`` if there is none or the file has changed"""
+        entry = self._entries.get(os.path.abspath(fname))
+        if entry is None or entry[0] != file_signature(fname):
+            return default
+        return entry[1]
+
+    def pop(self, fname, default=None):
+        """Like :meth:`get`, but also drop the entry for the file"""
+        entry = self._entries.pop(os.path.abspath(fname), None)
+        if entry is None or entry[0] != file_signature(fname):
+            return default
+        return entry[1]
+
+    def set(self, fname, value, signature):
+        """Store the value read from a file
+
+        Parameters
+        ----------
+        fname : str
+           The path to the file
+        value
+           The value read from the file
+        signature : tuple
+           The :func:`file_signature` taken before the file was read, so a file that
+           changed while it was read is never matched
+
+        """
+        if signature is None:
+            return
+        key = os.path.abspath(fname)
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.maxsize:
+            self._entries.popitem(last=False)
+        self._entries[key] = (signature, value)
+
+    def cached(self, fname, func):
+        """The cached value for a file, calling ``func(fname)`` to read it if needed"""
+        entry = self._entries.get(os.path.abspath(fname))
+        signature = file_signature(fname)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        value = func(fname)
+        self.set(fname, value, signature)
+        return value
+
+
+def parallel_map(func, tasks, nproc, chunksize=None):
+    """Apply ``func`` to each of ``tasks`` with up to ``nproc`` processes
+
+    Parameters
+    ----------
+    func : func
+       A module-level function taking a single task
+    tasks : list
+       The picklable arguments for each call
+    nproc : int
+       The maximum number of processes to use
+    chunksize : int, optional
+       The number of tasks sent to a process at a time [default: a quarter of each process's share]
+
+    Returns
+    -------
+    list
+       The return values of ``func`` in the order of ``tasks``
+
+    """
+    if nproc < 2 or len(tasks) < 2:
+        return [func(task) for task in tasks]
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (4 * nproc))
+    pool = multiprocessing.Pool(min(nproc, len(tasks)))
+    try:
+        return pool.map(func, tasks, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def tmp_dir(directory=None, prefix="tmp", suffix=""):
     """Return a filename for a temporary directory
 
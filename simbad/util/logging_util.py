@@ -2,6 +2,7 @@ from enum import Enum
 import json
 import logging.config
 import os
+import sys
 
 from simbad import LOGGING_CONFIG
 
@@ -36,6 +37,9 @@ def setup_logging(level, logfile=None, debugfile=None):
 
     # Reset some of the defaults
     config["handlers"]["console_handler"]["level"] = level.upper()
+    # Colouring output is wasted work when stdout is piped, e.g. under CCP4i2 or a batch scheduler
+    if not (hasattr(sys.stdout, "isatty") and sys.stdout.isatty()):
+        config["handlers"]["console_handler"]["formatter"] = "simpleFormatter"
     if logfile is not None:
         config["handlers"]["file_handler"]["filename"] = logfile
     if debugfile is not None:
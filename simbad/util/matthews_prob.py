@@ -12,6 +12,27 @@ from simbad.util.pdb_util import PdbStructure
 
 ABC = abc.ABCMeta('ABC', (object,), {})
 
+_SOLVENT_PROBABILITY_COEFFS = [
+    -14.105436736742137,
+    -0.47015366358636385,
+    -2.9151681976244639,
+    -0.49308859741473005,
+    0.90132625209729045,
+    0.033529051311488103,
+    0.088901407582105796,
+    0.10749856607909694,
+    0.055000918494099861,
+    -0.052424473641668454,
+    -0.045698882840119227,
+    0.076048484096718036,
+    -0.097645159906868589,
+    0.03904454313991608,
+    -0.072186667173865071,
+]
+
+# Built once, the polynomial is evaluated for every copy number of every model
+_SOLVENT_PROBABILITY = np.polynomial.Chebyshev(_SOLVENT_PROBABILITY_COEFFS, domain=[0, 1])
+
 
 class _MatthewsCoefficient(ABC):
     def __init__(self, cell_volume):
@@ -43,6 +64,9 @@ class SolventContent(_MatthewsCoefficient):
     def calculate_from_struct(self, struct):
         return self._calculate(struct.molecular_weight)
 
+    def calculate_from_molecular_weight(self, mw):
+        return self._calculate(mw)
+
     def _calculate(self, mw):
         if mw <= 0:
             raise ValueError("Incorrect Molecular Weight")
@@ -55,6 +79,8 @@ class SolventContent(_MatthewsCoefficient):
 class MatthewsProbability(_MatthewsCoefficient):
     def __init__(self, cell_volume):
         super(MatthewsProbability, self).__init__(cell_volume)
+        # The result only depends on the molecular weight for a given cell
+        self._scores = {}
 
     def calculate_from_file(self, pdb):
         struct = PdbStructure.from_file(pdb)
@@ -64,6 +90,11 @@ class MatthewsProbability(_MatthewsCoefficient):
         return self._calculate(struct.molecular_weight)
 
     def _calculate(self, mw):
+        if mw not in self._scores:
+            self._scores[mw] = self._calculate_scores(mw)
+        return self._scores[mw]
+
+    def _calculate_scores(self, mw):
         n_copies = 0
         solvent_fraction = 1.0
         scores = []
@@ -82,24 +113,7 @@ class MatthewsProbability(_MatthewsCoefficient):
         """Calculate solvent fraction probability"""
         assert 0 < solvent < 1
 
-        coeffs = [-14.105436736742137,
-                  -0.47015366358636385,
-                  -2.9151681976244639,
-                  -0.49308859741473005,
-                  0.90132625209729045,
-                  0.033529051311488103,
-                  0.088901407582105796,
-                  0.10749856607909694,
-                  0.055000918494099861,
-                  -0.052424473641668454,
-                  -0.045698882840119227,
-                  0.076048484096718036,
-                  -0.097645159906868589,
-                  0.03904454313991608,
-                  -0.072186667173865071]
-
-        chebyshev_poly = np.polynomial.Chebyshev(coeffs, domain=[0, 1])
-        return math.exp(chebyshev_poly(solvent))
+        return math.exp(_SOLVENT_PROBABILITY(solvent))
 
     def _get_max_score(self, scores):
         """Use the probability score to guess the number of copies and solvent content"""
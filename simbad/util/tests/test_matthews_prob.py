@@ -45,6 +45,29 @@ class Test(unittest.TestCase):
         self.assertAlmostEqual(np.round(data[0], 3), np.round(reference_data[0], 3))
         self.assertAlmostEqual(data[1], reference_data[1])
 
+    def test_matthews_prob_cache_1(self):
+        """Test case for matthews_prob.MatthewsProbability._calculate with repeated molecular weights"""
+
+        volume = 16522.4616729
+        MC = matthews_prob.MatthewsProbability(volume)
+        molecular_weights = [7139.0, 3500.0, 7139.0, 900.0, 3500.0, 7139.0]
+        for mw in molecular_weights:
+            data = MC._calculate(mw)
+            reference_data = matthews_prob.MatthewsProbability(volume)._calculate_scores(mw)
+            self.assertEqual(data, reference_data)
+            self.assertEqual(data, MC._calculate(mw))
+        self.assertEqual(sorted(MC._scores), sorted(set(molecular_weights)))
+
+    def test_solvent_probability_1(self):
+        """Test case for matthews_prob.MatthewsProbability._calculate_solvent_probability"""
+
+        MC = matthews_prob.MatthewsProbability(16522.4616729)
+        for solvent in (0.05, 0.3, 0.4896, 0.75, 0.95):
+            chebyshev_poly = np.polynomial.Chebyshev(matthews_prob._SOLVENT_PROBABILITY_COEFFS, domain=[0, 1])
+            reference_data = np.exp(chebyshev_poly(solvent))
+            self.assertAlmostEqual(MC._calculate_solvent_probability(solvent), reference_data)
+            self.assertEqual(MC._calculate_solvent_probability(solvent), MC._calculate_solvent_probability(solvent))
+
 
 if __name__ == "__main__":
     unittest.main()
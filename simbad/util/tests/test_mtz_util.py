@@ -25,12 +25,7 @@ class Test(unittest.TestCase):
 
         input_mtz = os.path.join(EXAMPLE_DIR, "toxd", "toxd.mtz")
         mtz_obj = mtz_parser.MtzParser(input_mtz)
-        if isinstance(mtz_obj.spacegroup_symbol, str):
-            space_group = "".join(mtz_obj.spacegroup_symbol.split())
-        elif isinstance(mtz_obj.spacegroup_symbol, unicode):
-            space_group = "".join(mtz_obj.spacegroup_symbol.encode("ascii").split())
-        else:
-            raise ValueError("Unknown object type for {}".format(mtz_obj.spacegroup_symbol))
+        space_group = "".join(str(mtz_obj.spacegroup_symbol).split())
 
         data = (
             space_group,
@@ -68,12 +63,7 @@ class Test(unittest.TestCase):
 
         input_mtz = os.path.join(EXAMPLE_DIR, "rnase", "rnase25.mtz")
         mtz_obj = mtz_parser.MtzParser(input_mtz)
-        if isinstance(mtz_obj.spacegroup_symbol, str):
-            space_group = "".join(mtz_obj.spacegroup_symbol.split())
-        elif isinstance(mtz_obj.spacegroup_symbol, unicode):
-            space_group = "".join(mtz_obj.spacegroup_symbol.encode("ascii").split())
-        else:
-            raise ValueError("Unknown object type for {}".format(mtz_obj.spacegroup_symbol))
+        space_group = "".join(str(mtz_obj.spacegroup_symbol).split())
 
         data = (
             space_group,
@@ -152,12 +142,7 @@ class Test(unittest.TestCase):
         temp_mtz = os.path.join(os.getcwd(), "input.mtz")
         mtz_util.reindex(input_mtz, temp_mtz, "18")
         mtz_obj = mtz_parser.MtzParser(temp_mtz)
-        if isinstance(mtz_obj.spacegroup_symbol, str):
-            space_group = "".join(mtz_obj.spacegroup_symbol.split())
-        elif isinstance(mtz_obj.spacegroup_symbol, unicode):
-            space_group = "".join(mtz_obj.spacegroup_symbol.encode("ascii").split())
-        else:
-            raise ValueError("Unknown object type for {}".format(mtz_obj.spacegroup_symbol))
+        space_group = "".join(str(mtz_obj.spacegroup_symbol).split())
 
         data = (
             space_group,
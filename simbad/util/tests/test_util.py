@@ -4,6 +4,7 @@ __author__ = "Adam Simpkin"
 __date__ = "19 Jan 2018"
 
 import os
+import shutil
 import tempfile
 import unittest
 import simbad.util
@@ -60,3 +61,140 @@ class Test(unittest.TestCase):
         reference_data = ["2fbb", 11.6]
 
         self.assertEqual(data, reference_data)
+
+    def test_best_result_from_csv_1(self):
+        """Test case for simbad.util.best_result_from_csv"""
+
+        csv_temp_file = tempfile.NamedTemporaryFile("w", delete=False)
+        csv_temp_file.write(
+            """pdb_code,phaser_tfz,phaser_llg,phaser_rfz,final_r_fact,final_r_free
+1E10,8.1,120.5,4.2,0.47,0.51
+1DTX,12.3,310.2,5.9,0.32,0.37
+2FBB,,,,,
+4W94,7.0,95.1,3.8,0.52,0.55"""
+        )
+        csv_temp_file.close()
+
+        data = simbad.util.best_result_from_csv(csv_temp_file.name, "final_r_free")
+        reference_data = ["1DTX", 0.37]
+        self.assertEqual(data, reference_data)
+
+        data = simbad.util.best_result_from_csv(csv_temp_file.name, "final_r_free", ascending=False)
+        reference_data = ["4W94", 0.55]
+        self.assertEqual(data, reference_data)
+
+    def test_summarize_result_1(self):
+        """Test case for simbad.util.summarize_result"""
+
+        from simbad.core.lattice_score import LatticeSearchResult
+
+        results = [
+            LatticeSearchResult("1DTX", None, " ", [23.19, 38.73, 73.58, 90.0, 90.0, 90.0], 0.0, 0.1, 0.1, 0.0, 0.892)
+        ]
+        columns = [
+            "alt", "a", "b", "c", "alpha", "beta", "gamma", "length_penalty", "angle_penalty", "total_penalty",
+            "volume_difference", "probability_score"
+        ]
+
+        csv_temp_file = tempfile.NamedTemporaryFile("w", delete=False)
+        csv_temp_file.close()
+        simbad.util.summarize_result(results, csv_file=csv_temp_file.name, columns=columns)
+        with open(csv_temp_file.name, "r") as f_in:
+            data = f_in.read().splitlines()
+        os.unlink(csv_temp_file.name)
+
+        reference_data = [
+            "pdb_code," + ",".join(columns),
+            "1DTX, ,23.19,38.73,73.58,90.0,90.0,90.0,0.1,0.0,0.1,0.0,0.892",
+        ]
+        self.assertEqual(data, reference_data)
+
+    def test_file_cache_1(self):
+        """Test case for simbad.util.FileCache"""
+
+        temp_files = []
+        for content in ("1", "22", "333"):
+            temp_file = tempfile.NamedTemporaryFile("w", delete=False)
+            temp_file.write(content)
+            temp_file.close()
+            temp_files.append(temp_file.name)
+
+        cache = simbad.util.FileCache(maxsize=2)
+        read_calls = []
+
+        def read(fname):
+            read_calls.append(fname)
+            with open(fname) as f_in:
+                return f_in.read()
+
+        self.assertEqual(cache.cached(temp_files[0], read), "1")
+        self.assertEqual(cache.cached(temp_files[0], read), "1")
+        self.assertEqual(read_calls, temp_files[:1])
+
+        # The oldest entry is dropped once the cache is full
+        cache.cached(temp_files[1], read)
+        cache.cached(temp_files[2], read)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(temp_files[0]))
+
+        # A changed file is read again
+        with open(temp_files[2], "w") as f_out:
+            f_out.write("4444")
+        self.assertEqual(cache.cached(temp_files[2], read), "4444")
+        self.assertEqual(read_calls, [temp_files[0], temp_files[1], temp_files[2], temp_files[2]])
+
+        for temp_file in temp_files:
+            os.unlink(temp_file)
+
+    def test_parallel_map_1(self):
+        """Test case for simbad.util.parallel_map"""
+
+        # A single process runs in this one, so even an unpicklable function works
+        offset = 10
+        data = simbad.util.parallel_map(lambda x: x + offset, [1, 2, 3], 1)
+        self.assertEqual(data, [11, 12, 13])
+
+        self.assertEqual(simbad.util.parallel_map(abs, [], 4), [])
+        self.assertEqual(simbad.util.parallel_map(abs, [-1], 4), [1])
+
+    def test_parallel_map_2(self):
+        """Test case for simbad.util.parallel_map"""
+
+        tasks = list(range(-50, 50))
+        data = simbad.util.parallel_map(abs, tasks, 4)
+        self.assertEqual(data, [abs(task) for task in tasks])
+
+        data = simbad.util.parallel_map(abs, tasks, 4, chunksize=1)
+        self.assertEqual(data, [abs(task) for task in tasks])
+
+    def test_parallel_map_3(self):
+        """Test case for simbad.util.parallel_map"""
+
+        with self.assertRaises(ValueError):
+            simbad.util.parallel_map(int, ["1", "2", "three", "4"], 2)
+        with self.assertRaises(ValueError):
+            simbad.util.parallel_map(int, ["1", "2", "three", "4"], 1)
+
+    def test_mkdir_p_1(self):
+        """Test case for simbad.util.mkdir_p"""
+
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "a", "b")
+
+        simbad.util.mkdir_p(path)
+        self.assertTrue(os.path.isdir(path))
+
+        # An existing directory is fine
+        simbad.util.mkdir_p(path)
+        self.assertTrue(os.path.isdir(path))
+
+        # A file in the way is not
+        fname = os.path.join(tmp_dir, "a", "c")
+        open(fname, "w").close()
+        with self.assertRaises(OSError):
+            simbad.util.mkdir_p(fname)
+        with self.assertRaises(OSError):
+            simbad.util.mkdir_p(os.path.join(fname, "d"))
+
+        shutil.rmtree(tmp_dir)
+